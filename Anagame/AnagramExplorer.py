@@ -1,7 +1,27 @@
+import functools
+import numpy as np
+from Anagame.anagram_index import MIN_WORD_LENGTH, anagram_key, build_anagram_index, letter_counts, sub_multiset_keys
+
+# racks up to this size are answered by looking up their sub-multisets, larger ones with the letter count matrix
+MAX_ENUMERATED_RACK = 7
+RACK_CACHE_SIZE = 4096  # racks whose anagrams and hint are kept, each
+
 class AnagramExplorer:
     def __init__(self, all_words: list[str]):
        self.__corpus = all_words
        self.anagram_lookup = self.build_lookup_dict() # Only calculated once, when the explorer object is created
+       self.max_word_length = max(map(len, self.anagram_lookup), default=0)
+
+       # every family of 2 or more words, in lookup order, with the letter counts of its words
+       self.families = [words for words in self.anagram_lookup.values() if len(words) > 1]
+       self.family_letter_counts = np.array([letter_counts(words[0]) for words in self.families], dtype=np.uint8).reshape(-1, 26)
+       self.family_sizes = np.array([len(words) for words in self.families], dtype=np.int64)
+       self.word_set = frozenset(all_words)
+       self.word_family = {word: family for family, words in enumerate(self.families) for word in words}
+
+       # keyed by the sorted rack, so every order of the same letters shares one entry
+       self.rack_anagrams = functools.lru_cache(maxsize=RACK_CACHE_SIZE)(self.__compute_rack_anagrams)
+       self.rack_hint = functools.lru_cache(maxsize=RACK_CACHE_SIZE)(self.__compute_rack_hint)
 
     @property
     def corpus(self):
@@ -29,7 +49,6 @@ class AnagramExplorer:
             Returns:
                 bool: Returns True if the word pair fulfills all validation requirements, otherwise returns False
         '''
-        word_list = self.__corpus
         pair = list(pair)
 
         # removes all non-letter characters  
@@ -41,48 +60,21 @@ class AnagramExplorer:
         pair[1] = pair[1].lower()  
 
         # check if word is valid
-        for word in pair: 
-          if word not in word_list: 
-             return False 
-                  
-        #check if lengths are equal and > 2      
-        if len(pair[0]) < 3 and len(pair[0]) == len(pair[1]):
-          return False
-               
-       #check variable types
-        if type(pair[0]) != str or type(pair[1]) != str:
+        if pair[0] not in self.word_set or pair[1] not in self.word_set:
           return False
-        
+
         #check that words are not identical
         if pair[0] == pair[1]:
            return False
-               
-        word1_product = 1
-        word2_product = 1
-        prime_map = self.get_prime_map()
-
-        for char in pair[0]:
-            if char.isalpha():
-                word1_product *=  prime_map[char]
 
-        for char in pair[1]:
-            if char.isalpha():
-                word2_product *=  prime_map[char]
-
-        if word1_product != word2_product:
+        # words of at least 3 letters that are anagrams of each other share a family,
+        # shorter words and words without an anagram have none
+        family = self.word_family.get(pair[0])
+        if family is None or family != self.word_family.get(pair[1]):
             return False
-        
-        for word in pair:
-           letters_copy = [word for word in letters]
-
-           for letter in word:
-              if letter not in letters_copy:
-                return False
-              
-              else: 
-                letters_copy.remove(letter)
-        
-        return True
+
+        # both words use the same letters, so checking the family's letters covers both
+        return bool((self.family_letter_counts[family] <= letter_counts(letters)).all())
 
     def prime_hash(self, word: str):
         #calculates the prime hash value for a given word
@@ -96,7 +88,7 @@ class AnagramExplorer:
         return hash_value
         
     def build_lookup_dict(self) -> dict:
-        '''Creates a fast dictionary look-up (via either prime hash or sorted tuple) of all anagrams in a word corpus.
+        '''Creates a fast dictionary look-up (via sorted letters, see anagram_index.anagram_key) of all anagrams in a word corpus.
        
             Args:
                 corpus (list): A list of words which should be considered
@@ -104,23 +96,7 @@ class AnagramExplorer:
             Returns:
                 dict: Returns a dictionary with  keys that return sorted lists of all anagrams of the key (per the corpus)
         '''
-        hash_dict = {}
-
-        for word in self.__corpus:
-            if len(word) < 3: 
-               continue 
-            
-            prime_hash_value = self.prime_hash(word)
-
-            if (prime_hash_value) in hash_dict:
-                hash_dict[prime_hash_value].append(word)
-                hash_dict[prime_hash_value] = sorted(hash_dict[prime_hash_value])
-            
-            else: 
-                hash_dict[prime_hash_value] = [word]
-                hash_dict[prime_hash_value] = sorted(hash_dict[prime_hash_value])
-
-        return hash_dict
+        return build_anagram_index(self.__corpus)
 
     def characters_of_word_in_letters(self, word, letters: list[str]) -> bool:
       letters_copy = [letter for letter in letters]
@@ -151,7 +127,7 @@ class AnagramExplorer:
 
       return hash_value
         
-    def get_all_anagrams(self, letters: list[str]) -> set:
+    def get_all_anagrams(self, letters: list[str]) -> frozenset:
         '''Creates a set of all unique words that could have been used to form an anagram pair.
            Words which can't create any anagram pairs should not be included in the set.
 
@@ -163,31 +139,30 @@ class AnagramExplorer:
               letters (list): A list of letters from which the anagrams should be created
 
             Returns:
-              set: all unique words in corpus which form at least 1 anagram pair
+              frozenset: all unique words in corpus which form at least 1 anagram pair, shared between calls with the same letters
         '''
-        # alternative solution
-        unique_words = set()   
+        return self.rack_anagrams(anagram_key(letters))
 
-        for key, words in self.anagram_lookup.items():
-          if len(words) > 1:
-                if self.prime_hash(letters) % key == 0:
-                  unique_words = unique_words.union(words)
+    def __compute_rack_anagrams(self, letters: str) -> frozenset:
+        if len(letters) > MAX_ENUMERATED_RACK:
+            # too many sub-multisets to try, check every family instead
+            return frozenset().union(*[self.families[i] for i in np.flatnonzero(self.families_in_rack(letters))])
 
-        return unique_words
+        # every family that fits in the rack is keyed by one of the rack's sub-multisets
+        unique_words = set()
 
-        # unique_words = set()   
-        # combos = set()
+        for key in sub_multiset_keys(letters, MIN_WORD_LENGTH, self.max_word_length):
+          words = self.anagram_lookup.get(key)
+          if words is not None and len(words) > 1:
+                unique_words.update(words)
 
-        # for i in range(3, 8):
-        #    combos.add(itertools.combinations(letters, i))
-        
-        # combos = list(combos)
+        return frozenset(unique_words)
 
-        # for combo in combos:
-        #   if combo in self.anagram_lookup and len(self.anagram_lookup[combo]) > 1:
-        #     unique_words = unique_words.union(self.anagram_lookup[combo])
-        
-        return unique_words
+    def families_in_rack(self, letters: list[str]) -> np.ndarray:
+        '''Which of self.families can be spelled with the given letters, as a boolean array.
+           Works for racks of any size.
+        '''
+        return (self.family_letter_counts <= letter_counts(letters)).all(axis=1)
 
     def get_most_anagrams(self, letters:list[str]) -> str:
         '''Returns any word from one of the largest lists of anagrams that 
@@ -197,18 +172,25 @@ class AnagramExplorer:
               letters (list): A list of letters from which the anagrams should be created
 
             Returns:
-              str: a single word from the largest anagram families
+              str: a single word from the largest anagram families, None if no family can be formed
         '''
-
-        highest_length = 1
-        highest_key = None
-
-        for i, j in self.anagram_lookup.items():
-          if len(j) > highest_length and self.characters_of_word_in_letters(j[0], letters):
-              highest_length = len(j)
-              highest_key = i
-
-        return(self.anagram_lookup[highest_key][0])
+        return self.rack_hint(anagram_key(letters))
+
+    def __compute_rack_hint(self, letters: str) -> str:
+        sizes = np.where(self.families_in_rack(letters), self.family_sizes, 0)
+        if len(sizes) == 0 or sizes.max() == 0:
+            return None
+
+        # argmax picks the first of the largest families, in lookup order
+        return self.families[int(np.argmax(sizes))][0]
+
+    def cache_metrics(self) -> dict:
+        metrics = {}
+        for name, cache in (("anagrams", self.rack_anagrams), ("hint", self.rack_hint)):
+            info = cache.cache_info()
+            lookups = info.hits + info.misses
+            metrics[name] = dict(info._asdict(), hit_rate=info.hits / lookups if lookups else None)
+        return metrics
                        
 if __name__ == "__main__":
   words1 = [
@@ -1,8 +1,8 @@
-import random
-from Anagame.valid_anagame_words import get_valid_word_list
+from Anagame.word_store import get_valid_words
 from Anagame.AnagramExplorer import AnagramExplorer
+from Anagame.rack_table import RackTable, draw_rack
 
-def generate_letters(fun_factor: int, distribution: str, explorer:AnagramExplorer) -> list:
+def generate_letters(fun_factor: int, distribution: str, explorer:AnagramExplorer, rack_table:RackTable = None) -> list:
     '''Generates a list of 7 randomly-chosen lowercase letters which can form at least 
       fun_factor unique anagramable words.
 
@@ -13,41 +13,30 @@ def generate_letters(fun_factor: int, distribution: str, explorer:AnagramExplore
                 "uniform" - chooses letters based on a uniform distribution, with replacement
                 "scrabble" - chooses letters based on a scrabble distribution, without replacement
           explorer (AnagramExplorer): helper object used to facilitate computing anagrams based on specific letters.
+          rack_table (RackTable): precomputed anagram counts of every rack. When given, the letters are drawn
+                straight from the racks that meet fun_factor instead of drawing until one does.
          
          Returns:
              set: A set of 7 lowercase letters
 
+         Raises:
+             ValueError: if the distribution is unknown, or (with rack_table) no rack meets fun_factor
+
          Example
          -------
-         >>> explorer = AnagramExplorer(get_valid_word_list())
+         >>> explorer = AnagramExplorer(get_valid_words())
          >>> generate_letters(75, "scrabble", explorer)
          ["p", "o", "t", "s", "r", "i", "a"] 
     '''   
-    letters = ["p", "o", "t", "s", "r", "i", "a"] 
-    fun_factor_achieved = False
     distribution = distribution.lower()
 
-    while (fun_factor_achieved == False):
-        if distribution == "uniform":
-            uniform_distribution = "abcdiefghjklmnopqrstuvwxyz"
-            uniform_distribution = list(uniform_distribution)
-            for i in range(7):
-                letters[i] = uniform_distribution[int(random.random()*25)]
-
-        elif distribution == "scrabble":
-            scrabble_distribution = "aaaaaaaaabbccddddeeeeeeeeeeeeffggghhiiiiiiiiijkllllmmnnnnnnooooooooppqrrrrrrssssttttttuuuuvvwwxyyz"
-            scrabble_distribution = list(scrabble_distribution)
-            for i in range(7):
-                index = int(random.random()*len(scrabble_distribution) - 1)
-                letters[i] = scrabble_distribution[index]
-                scrabble_distribution.remove(scrabble_distribution[index])
-        print(letters)
-        if (fun_factor <= (len(explorer.get_all_anagrams(letters)))):
-            fun_factor_achieved = True
-
-    # print(type(explorer.get_all_anagrams(letters)))
-    # print(len(explorer.get_all_anagrams(letters)))
-    # print(fun_factor <= (len(explorer.get_all_anagrams(letters))))
+    if rack_table is not None:
+        return rack_table.sample(fun_factor, distribution)
+
+    letters = draw_rack(distribution)
+    while fun_factor > len(explorer.get_all_anagrams(letters)):
+        letters = draw_rack(distribution)
+
     return letters
 
 
@@ -74,7 +63,6 @@ def parse_guess(guess:str) -> tuple:
         >>> parse_guess("eat tea")
         ("", "")
    '''
-   print("parse guess: ", guess)
    guess = list(guess)
 
    for i in range(len(guess)): 
@@ -83,6 +71,9 @@ def parse_guess(guess:str) -> tuple:
 
    return tuple(guess)
    
+# points for a valid pair, by the length of its words
+WORD_LENGTH_SCORES = {3: 1, 4: 2, 5: 3, 6: 3, 7: 5}
+
 def calc_stats(guesses: list, letters: list, explorer) -> dict:
     '''Aggregates several statistics into a single dictionary with the following key-value pairs:
         "valid" - list of valid guesses
@@ -106,7 +97,7 @@ def calc_stats(guesses: list, letters: list, explorer) -> dict:
      -------
      >>> letters = ["p", "o", "t", "s", "r", "i", "a"]
      >>> guesses = [("star","tarts"),("far","rat"),("rat","art"),("rat","art"),("art","rat")]
-     >>> explorer = AnagramExplorer(get_valid_word_list())
+     >>> explorer = AnagramExplorer(get_valid_words())
      >>> calc_stats(guesses, letters, explorer)
      {
         "valid":[("rat","art")],
@@ -118,86 +109,31 @@ def calc_stats(guesses: list, letters: list, explorer) -> dict:
         "skill": 2
      }
     '''
-    stats = [[], [], [], [], [], [], []]
-    stats[0] = []   #list of lists: "valid"
-    stats[1] = [] #list of lists: "invalid"
-    stats[2] = 0    #total score per the rules of the game: "score"
-    stats[3] = 0 # truncated int percentage representing valid player guesses out of all player guesses
-                 # "accuracy"
-    stats[4] = 0    #truncated int percentage representing unique guessed words out of all possible unique anagram words
-                 # "skill"
-    stats[5] = set() #unique valid guessed words: "guessed"
-    stats[6] = set() #unique words the player could have guessed, but didn’t: "not guessed"
-
-    guesses_copy = []
-    for guess in guesses: 
-        print("guess: ", guess)
-        temp = parse_guess(tuple(guess))
-        guesses_copy.append(temp)
-        print("guesses copy: ", guesses_copy)
-
-    guesses = guesses_copy
-
-    for guess in guesses: 
-       if len(guess) == 2 and explorer.is_valid_anagram_pair((guess[0], guess[1]), letters) and sorted(guess) not in stats[0]:
-            stats[0].append(sorted(guess))
-            print(stats[0])
-
-       else: 
-          stats[1].append(guess)
-
-    if len(guesses) == 0: 
-       stats[3] = 0
-    
-    else:
-        stats[3] = int ((len(stats[0]) / len(guesses)) * 100)
-
-    for pair in stats[0]:
-       for word in pair: 
-          stats[5].add(word)
-
-    stats[6] = explorer.get_all_anagrams(letters)
-
-    guessed_words = set()
-
-    for word in stats[6]:
-       if word in stats[5]:
-          guessed_words.add(word)
-
-    for word in guessed_words: 
-       stats[6].remove(word)
-       
-    stats[6] = list(filter(lambda item: item is not None, stats[6]))
-
-    if len(explorer.get_all_anagrams(letters)) == 0:
-       stats[4] = 0
-
-    else: 
-        stats[4] = int((len(stats[5]) / len(explorer.get_all_anagrams(letters))) * 100)
-
-    for pair in stats[0]: 
-       if len(pair[0]) == 3:
-            stats[2] += 1
-        
-       elif len(pair[0]) == 4:
-            stats[2] += 2
-
-       elif len(pair[0]) == 5:
-            stats[2] += 3    
-
-       elif len(pair[0]) == 6:
-            stats[2] += 3
-
-       elif len(pair[0]) == 7:
-            stats[2] += 5
-
-    stats[6] = sorted(stats[6])
-    sorted_stats = sorted(stats[6], key=lambda x: explorer.prime_hash(x))
-
-    stats[5] = list(stats[5])
-    stats[6] = sorted_stats
-
-    return stats
-
-  
-  
\ No newline at end of file
+    all_anagrams = explorer.get_all_anagrams(letters)  # computed once, every statistic below reads it
+
+    valid = []
+    invalid = []
+    seen_pairs = set()  # sorted valid pairs, to count a pair only once whatever its order
+    guessed = {}  # unique valid guessed words, in the order they were first guessed
+    score = 0
+
+    for guess in guesses:
+        guess = parse_guess(tuple(guess))
+        pair = tuple(sorted(guess))
+
+        if len(guess) == 2 and pair not in seen_pairs and explorer.is_valid_anagram_pair(guess, letters):
+            seen_pairs.add(pair)
+            valid.append(list(pair))
+            guessed.update(dict.fromkeys(pair))
+            score += WORD_LENGTH_SCORES.get(len(pair[0]), 0)
+        else:
+            invalid.append(guess)
+
+    accuracy = int((len(valid) / len(guesses)) * 100) if guesses else 0
+    skill = int((len(guessed) / len(all_anagrams)) * 100) if all_anagrams else 0
+
+    # alphabetical within each family, families in prime hash order
+    not_guessed = sorted((word for word in all_anagrams if word not in guessed),
+                         key=lambda word: (explorer.prime_hash(word), word))
+
+    return [valid, invalid, score, accuracy, skill, list(guessed), not_guessed]
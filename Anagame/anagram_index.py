@@ -0,0 +1,101 @@
+'''
+Groups a word list into anagram families keyed by their sorted letters.
+
+Two words are anagrams exactly when their letters sort to the same string, so every word is
+placed with one dictionary lookup and each family is sorted once when the index is finished.
+Words can be added one at a time, so the index can be built while a word source is streamed.
+
+Usage (prints how long the index takes to build for the full word list):
+  python -m Anagame.anagram_index [--repeat 20]
+'''
+import argparse
+import time
+import numpy as np
+
+MIN_WORD_LENGTH = 3  # shorter words cannot be played
+
+def anagram_key(word) -> str:
+    '''The sorted letters of word (a string or a list of letters), the same for all of its anagrams.'''
+    return "".join(sorted(word))
+
+def letter_counts(letters) -> np.ndarray:
+    '''How many times each of a-z appears in letters (a string or a list of letters), as 26 uint8
+       counts. Anything other than a-z is ignored and counts stop at 255.
+    '''
+    codes = np.frombuffer("".join(letters).encode("ascii", "ignore"), dtype=np.uint8).astype(np.intp) - ord("a")
+    counts = np.bincount(codes[(codes >= 0) & (codes < 26)], minlength=26)
+    return np.minimum(counts, 255).astype(np.uint8)
+
+def sub_multiset_keys(letters, min_length: int, max_length: int):
+    '''Yields every distinct sub-multiset of letters with min_length to max_length letters, as
+       sorted strings. A rack with repeated letters yields each sub-multiset only once, so a
+       7-letter rack never gives more than 99 keys of 3 letters or more.
+    '''
+    distinct = sorted(set(letters))
+    remaining = [list(letters).count(letter) for letter in distinct]
+
+    def extend(start: int, prefix: str):
+        # letters are only appended in sorted order, which makes every prefix its own key
+        if len(prefix) >= min_length:
+            yield prefix
+        if len(prefix) < max_length:
+            for i in range(start, len(distinct)):
+                if remaining[i]:
+                    remaining[i] -= 1
+                    yield from extend(i, prefix + distinct[i])
+                    remaining[i] += 1
+
+    return extend(0, "")
+
+class AnagramIndexBuilder:
+    def __init__(self):
+        self.families = {}
+
+    def add(self, word: str):
+        if len(word) < MIN_WORD_LENGTH:
+            return
+        key = anagram_key(word)
+        family = self.families.get(key)
+        if family is None:
+            self.families[key] = [word]
+        else:
+            family.append(word)
+
+    def add_all(self, words):
+        for word in words:
+            self.add(word)
+
+    def build(self) -> dict:
+        '''Returns the index, each family sorted alphabetically. Families keep the order in which
+           their first word was added.
+        '''
+        for family in self.families.values():
+            if len(family) > 1:
+                family.sort()
+        return self.families
+
+def build_anagram_index(words) -> dict:
+    builder = AnagramIndexBuilder()
+    builder.add_all(words)
+    return builder.build()
+
+def main():
+    from Anagame.word_store import get_valid_words
+
+    parser = argparse.ArgumentParser(description="Time building the anagram index for the Anagame word list.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    words = get_valid_words()
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        index = build_anagram_index(words)
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    print("Indexed", len(words), "words into", len(index), "families")
+    print("best", round(timings[0] * 1000, 2), "ms, median", round(timings[len(timings) // 2] * 1000, 2), "ms")
+
+if __name__ == "__main__":
+    main()
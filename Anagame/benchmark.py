@@ -0,0 +1,63 @@
+'''
+Times calc_stats on games of 10, 100 and 1,000 guesses.
+
+Every game is played on a rack with plenty of anagrams. About half of its guesses are pairs from
+the rack's anagram families (some of them repeated), and the rest are pairs of random words,
+which are almost always invalid. The same seed always gives the same games.
+
+Usage (from the repository root):
+  python -m Anagame.benchmark [--sizes 10 100 1000] [--repeat 20] [--output report.json]
+'''
+import argparse
+import json
+import random
+import time
+from Anagame.AnagramExplorer import AnagramExplorer
+from Anagame.anagame import calc_stats
+from Anagame.word_store import get_valid_words
+from Shared.benchmark_utils import current_commit, percentiles
+
+RACKS = [["p", "o", "t", "s", "r", "i", "a"], ["a", "e", "i", "l", "r", "s", "t"], ["e", "a", "r", "t", "n", "s", "d"]]
+
+def make_game(explorer: AnagramExplorer, letters: list[str], num_guesses: int, rng: random.Random) -> list:
+    families = [explorer.families[explorer.word_family[word]] for word in sorted(explorer.get_all_anagrams(letters))]
+    words = explorer.corpus
+    guesses = []
+    for _ in range(num_guesses):
+        if families and rng.random() < 0.5:
+            guesses.append(rng.sample(rng.choice(families), 2))
+        else:
+            guesses.append([words[rng.randrange(len(words))], words[rng.randrange(len(words))]])
+    return guesses
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark calc_stats on games of different lengths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="number of guesses per game")
+    parser.add_argument("--repeat", type=int, default=20, help="times each game is scored")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    explorer = AnagramExplorer(get_valid_words())
+
+    results = {}
+    for size in args.sizes:
+        samples = []
+        for letters in RACKS:
+            guesses = make_game(explorer, letters, size, rng)
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                calc_stats(guesses, letters, explorer)
+                samples.append((time.perf_counter() - start) * 1000)
+        results[size] = percentiles(samples)
+
+    report = {"commit": current_commit(), "repeat": args.repeat, "calc_stats": results}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
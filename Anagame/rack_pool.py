@@ -0,0 +1,106 @@
+import collections
+import random
+import threading
+import time
+import numpy as np
+from Anagame.rack_table import DISTRIBUTIONS, RackTable
+
+POOL_DEPTH = 32
+
+class RackPool:
+    '''Racks drawn ahead of time by a background thread, one pool per (distribution, anagram count).
+
+       A request first picks a count of at least its fun factor, with the total probability the
+       distribution gives the racks with that count, and then takes a rack from that count's
+       pool. Every rack it gets is therefore drawn with the same probability as when the table is
+       sampled inline, and no rack is ever thrown away. Only when the pool for the picked count is
+       empty is a rack with that count drawn inline instead.
+    '''
+    def __init__(self, rack_table: RackTable, depth: int = POOL_DEPTH):
+        self.rack_table = rack_table
+        self.depth = depth
+        # count_weights[distribution][c] is the total weight of the racks with exactly c anagram words
+        self.count_weights = {}
+        for distribution in DISTRIBUTIONS:
+            cumulative = np.concatenate([[0.0], rack_table.cumulative_weights[distribution]])
+            at_least = cumulative[rack_table.ends]  # total weight of the racks with at least c words
+            self.count_weights[distribution] = np.append(at_least[:-1] - at_least[1:], 0.0)
+        self.pools = {(distribution, count): collections.deque()
+                      for distribution in DISTRIBUTIONS for count in np.flatnonzero(self.count_weights[distribution]).tolist()}
+        self.wanted = threading.Event()  # set when a pool may need topping up
+        self.stopped = False
+        self.thread = threading.Thread(target=self.__refill_forever, name="rack-pool", daemon=True)
+
+        self.lock = threading.Lock()  # guards the counters below
+        self.served = 0
+        self.fallbacks = collections.Counter()
+        self.refilled = 0
+        self.refill_seconds = 0.0
+
+    def start(self):
+        self.wanted.set()
+        self.thread.start()
+
+    def stop(self):
+        self.stopped = True
+        self.wanted.set()
+
+    def take(self, fun_factor: int, distribution: str):
+        '''Returns a rack with at least fun_factor anagram words, or None if the pools do not
+           cover the request and the caller has to draw one: an unknown distribution, a fun factor
+           no rack meets, or one of 0 or less, which any rack meets.
+        '''
+        distribution = distribution.lower()
+        if distribution not in DISTRIBUTIONS or fun_factor <= 0 or fun_factor > self.rack_table.max_count:
+            return None
+
+        weights = np.cumsum(self.count_weights[distribution][fun_factor:])
+        if weights[-1] == 0:
+            return None
+        count = fun_factor + int(np.searchsorted(weights, random.random() * weights[-1], side="right"))
+        self.wanted.set()
+
+        try:
+            letters = self.pools[(distribution, count)].popleft()
+        except IndexError:
+            # drawn from the same count, a draw for the whole fun factor would favour the counts whose pools are full
+            with self.lock:
+                self.fallbacks[distribution + "/" + str(count)] += 1
+            return self.rack_table.sample_count(count, distribution)
+        with self.lock:
+            self.served += 1
+        return letters
+
+    def __refill_forever(self):
+        while not self.stopped:
+            self.wanted.wait()
+            self.wanted.clear()
+            for (distribution, count), pool in self.pools.items():
+                if len(pool) < self.depth:
+                    self.__refill(pool, distribution, count)
+
+    def __refill(self, pool: collections.deque, distribution: str, count: int):
+        start = time.perf_counter()
+        added = 0
+        while len(pool) < self.depth and not self.stopped:
+            pool.append(self.rack_table.sample_count(count, distribution))
+            added += 1
+        with self.lock:
+            self.refilled += added
+            self.refill_seconds += time.perf_counter() - start
+
+    def metrics(self) -> dict:
+        with self.lock:
+            depth = collections.Counter()
+            empty = collections.Counter()
+            for (distribution, count), pool in self.pools.items():
+                depth[distribution] += len(pool)
+                empty[distribution] += not pool
+            return {
+                "depth": dict(depth),
+                "empty_pools": dict(empty),
+                "served": self.served,
+                "fallbacks": dict(self.fallbacks),
+                "refilled": self.refilled,
+                "refill_racks_per_second": self.refilled / self.refill_seconds if self.refill_seconds else None,
+            }
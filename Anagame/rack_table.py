@@ -0,0 +1,222 @@
+'''
+Precomputed anagram counts for every possible 7-letter rack.
+
+A rack is a multiset of 7 letters, so there are C(32, 7) = 3,365,856 of them. Each one is numbered
+by its rank in the combinatorial number system: the sorted letters a0 <= ... <= a6 (as 0-25)
+become the strictly increasing b_i = a_i + i, and the rank is the sum of C(b_i, i + 1). The count
+of a rack is len(AnagramExplorer.get_all_anagrams(rack)). Anagram families do not share words,
+so the count is the sum of the sizes of the families that fit in the rack. The table is built by
+adding every family's size to every rack that contains it, which takes about a second.
+
+Only racks with at least one anagram word are stored, sorted by count from high to low. The
+racks that meet a fun factor are therefore always a prefix of the table, and a rack is drawn from
+that prefix with the probability the letter distribution gives it.
+
+Usage:
+  python -m Anagame.rack_table [--output Anagame/rack_table.npz]
+'''
+import argparse
+import hashlib
+import itertools
+import math
+import os
+import random
+import time
+import numpy as np
+from Shared.file_utils import atomic_write
+
+RACK_SIZE = 7
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+SCRABBLE_BAG = "aaaaaaaaabbccddddeeeeeeeeeeeeffggghhiiiiiiiiijkllllmmnnnnnnooooooooppqrrrrrrssssttttttuuuuvvwwxyyz"
+DISTRIBUTIONS = ("uniform", "scrabble")
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rack_table.npz")
+
+# BINOMIALS[v, k] is C(v, k) for every value a rank can use
+BINOMIALS = np.array([[math.comb(v, k) for k in range(RACK_SIZE + 1)] for v in range(len(ALPHABET) + RACK_SIZE)], dtype=np.int64)
+
+def word_list_checksum(words) -> str:
+    # a table only applies to the exact word list it was built from
+    return hashlib.sha256("\n".join(words).encode()).hexdigest()
+
+def draw_rack(distribution: str) -> list[str]:
+    '''Draws RACK_SIZE letters, with replacement from the alphabet for "uniform" and without
+       replacement from the Scrabble tiles for "scrabble".
+    '''
+    if distribution == "uniform":
+        return random.choices(ALPHABET, k=RACK_SIZE)
+    if distribution == "scrabble":
+        return random.sample(SCRABBLE_BAG, RACK_SIZE)
+    raise ValueError("unknown distribution " + repr(distribution))
+
+def rack_ranks(racks: np.ndarray) -> np.ndarray:
+    '''Rank of each row of racks, which hold the letters (0-25) of one rack in sorted order.'''
+    values = racks.astype(np.int64) + np.arange(RACK_SIZE)
+    return sum(BINOMIALS[values[:, i], i + 1] for i in range(RACK_SIZE))
+
+def unrank_racks(ranks: np.ndarray) -> np.ndarray:
+    '''The sorted letters (0-25) of the racks with the given ranks, one row per rack.'''
+    ranks = ranks.astype(np.int64)
+    racks = np.empty((len(ranks), RACK_SIZE), dtype=np.uint8)
+    for i in range(RACK_SIZE - 1, -1, -1):
+        # the largest value whose binomial still fits in what is left of the rank
+        values = np.searchsorted(BINOMIALS[:, i + 1], ranks, side="right") - 1
+        ranks = ranks - BINOMIALS[values, i + 1]
+        racks[:, i] = values - i
+    return racks
+
+def rack_weights(racks: np.ndarray, distribution: str) -> np.ndarray:
+    '''Probability of drawing each rack, up to a constant factor, under the distribution.
+
+       A letter drawn c times counts 1/c! towards the uniform weight and C(n, c) towards the
+       Scrabble weight, where n is how many tiles of it the bag holds. Both are built up one
+       position at a time from the length of the run of equal letters ending there.
+    '''
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError("unknown distribution " + repr(distribution))
+
+    tiles = np.array([SCRABBLE_BAG.count(letter) for letter in ALPHABET], dtype=np.float64)
+    weights = np.ones(len(racks))
+    run = np.zeros(len(racks))
+    for i in range(RACK_SIZE):
+        run = np.where(racks[:, i] == racks[:, i - 1], run + 1, 1) if i > 0 else run + 1
+        if distribution == "uniform":
+            weights /= run
+        else:
+            weights *= np.maximum(tiles[racks[:, i]] - run + 1, 0) / run
+    return weights
+
+def build_rack_counts(anagram_lookup: dict) -> np.ndarray:
+    '''Number of anagram words of every rack, indexed by rank.'''
+    counts = np.zeros(math.comb(len(ALPHABET) + RACK_SIZE - 1, RACK_SIZE), dtype=np.uint16)
+    families = [(key, len(words)) for key, words in anagram_lookup.items()
+                if len(words) > 1 and len(key) <= RACK_SIZE and set(key) <= set(ALPHABET)]
+    # every multiset of letters that can be added to a word of each length to fill up a rack
+    fillers = {}
+    for size in {RACK_SIZE - len(key) for key, _ in families}:
+        combinations = itertools.combinations_with_replacement(range(len(ALPHABET)), size)
+        fillers[size] = np.array(list(combinations), dtype=np.uint8).reshape(math.comb(len(ALPHABET) + size - 1, size), size)
+
+    for key, size in families:
+        filler = fillers[RACK_SIZE - len(key)]
+        letters = np.frombuffer(key.encode("ascii"), dtype=np.uint8) - ord("a")
+        racks = np.sort(np.hstack([np.broadcast_to(letters, (len(filler), len(key))), filler]), axis=1)
+        # the racks are all different, so no rank repeats within one family
+        counts[rack_ranks(racks)] += size
+
+    return counts
+
+class RackTable:
+    '''Racks with at least one anagram word, sorted by count from high to low.'''
+    def __init__(self, ranks: np.ndarray, counts: np.ndarray):
+        self.ranks = ranks
+        self.counts = counts
+        # ends[f] is how many racks have at least f anagram words, for f up to the highest count + 1
+        self.ends = np.cumsum(np.bincount(counts, minlength=int(counts.max(initial=0)) + 2)[::-1])[::-1]
+        by_rank = np.argsort(ranks, kind="stable")
+        self.sorted_ranks = ranks[by_rank]
+        self.sorted_rank_counts = counts[by_rank]
+        self.cumulative_weights = {}
+        racks = unrank_racks(ranks)
+        for distribution in DISTRIBUTIONS:
+            self.cumulative_weights[distribution] = np.cumsum(rack_weights(racks, distribution))
+
+    @classmethod
+    def from_counts(cls, counts: np.ndarray):
+        ranks = np.flatnonzero(counts)
+        order = np.argsort(-counts[ranks].astype(np.int64), kind="stable")
+        return cls(ranks[order].astype(np.uint32), counts[ranks[order]])
+
+    @classmethod
+    def load(cls, path: str, words):
+        '''Reads a table written by this module.
+
+            Raises:
+             ValueError: if the table was built from a different word list than words
+        '''
+        with np.load(path) as data:
+            if str(data["checksum"]) != word_list_checksum(words):
+                raise ValueError("rack table was built from a different word list")
+            return cls(data["ranks"], data["counts"])
+
+    def __len__(self):
+        return len(self.ranks)
+
+    @property
+    def max_count(self) -> int:
+        return int(self.counts[0]) if len(self.counts) else 0
+
+    def count(self, letters: list[str]) -> int:
+        '''Number of anagram words of a rack of RACK_SIZE letters.'''
+        rank = rack_ranks(np.array([sorted(ALPHABET.index(letter) for letter in letters)])).astype(self.sorted_ranks.dtype)[0]
+        index = int(np.searchsorted(self.sorted_ranks, rank))  # same dtype, or numpy converts the whole array
+        if index < len(self.sorted_ranks) and self.sorted_ranks[index] == rank:
+            return int(self.sorted_rank_counts[index])
+        return 0
+
+    def sample(self, fun_factor: int, distribution: str) -> list[str]:
+        '''Draws a rack with at least fun_factor anagram words, each with its probability under the
+           distribution. Its letters are returned in a random order.
+
+            Raises:
+             ValueError: if the distribution is unknown or no rack has fun_factor anagram words
+        '''
+        if fun_factor <= 0:
+            return draw_rack(distribution)  # racks without anagram words are not stored, but any rack will do
+
+        # counts are sorted from high to low, so the racks that qualify come first
+        letters = self.__draw(0, int(self.ends[min(fun_factor, len(self.ends) - 1)]), distribution)
+        if letters is None:
+            raise ValueError("no rack has " + str(fun_factor) + " anagram words under the " + distribution + " distribution")
+        return letters
+
+    def sample_count(self, count: int, distribution: str) -> list[str]:
+        '''Draws a rack with exactly count anagram words, each with its probability under the
+           distribution. Its letters are returned in a random order.
+
+            Raises:
+             ValueError: if the distribution is unknown or no rack has exactly count anagram words
+        '''
+        letters = None
+        if 0 < count < len(self.ends) - 1:
+            # the racks with exactly count words sit between those with more and those with fewer
+            letters = self.__draw(int(self.ends[count + 1]), int(self.ends[count]), distribution)
+        if letters is None:
+            raise ValueError("no rack has exactly " + str(count) + " anagram words under the " + distribution + " distribution")
+        return letters
+
+    def __draw(self, start: int, end: int, distribution: str):
+        # one of the racks start to end - 1 by weight, or None if all of their weights are 0
+        cumulative = self.cumulative_weights.get(distribution)
+        if cumulative is None:
+            raise ValueError("unknown distribution " + repr(distribution))
+        before = cumulative[start - 1] if start > 0 else 0.0
+        if end <= start or cumulative[end - 1] == before:
+            return None
+
+        target = before + random.random() * (cumulative[end - 1] - before)
+        index = min(start + int(np.searchsorted(cumulative[start:end], target, side="right")), end - 1)
+        letters = [ALPHABET[letter] for letter in unrank_racks(self.ranks[index:index + 1])[0]]
+        random.shuffle(letters)
+        return letters
+
+def main():
+    from Anagame.AnagramExplorer import AnagramExplorer
+    from Anagame.word_store import get_valid_words
+
+    parser = argparse.ArgumentParser(description="Build the Anagame rack table.")
+    parser.add_argument("--output", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    words = get_valid_words()
+    start = time.perf_counter()
+    counts = build_rack_counts(AnagramExplorer(words).anagram_lookup)
+    table = RackTable.from_counts(counts)
+    elapsed = time.perf_counter() - start
+
+    with atomic_write(args.output) as file:
+        np.savez_compressed(file, checksum=np.array(word_list_checksum(words)), ranks=table.ranks,
+                            counts=table.counts.astype(np.uint8 if table.max_count < 256 else np.uint16))
+    print("Wrote", args.output, "with", len(table), "racks in", round(elapsed, 2), "seconds, highest count", table.max_count)
+
+if __name__ == "__main__":
+    main()
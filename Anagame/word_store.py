@@ -0,0 +1,166 @@
+'''
+Compact on-disk copy of the Anagame word list.
+
+File layout (all integers little-endian):
+
+  offset  size      field
+  0       8         magic, b"ANAWORDS"
+  8       2         format version (uint16), currently 2
+  10      2         flags (uint16), bit 0 set when the words are sorted
+  12      4         number of words N (uint32)
+  16      4         size of the string blob in bytes (uint32)
+  20      32        SHA-256 of the string blob
+  52      32        SHA-256 of the valid_anagame_words.py the words came from, 0 if unknown
+  84      12        reserved, 0
+  96      4*(N+1)   offsets (uint32), word i is blob[offsets[i]:offsets[i + 1]]
+  ...               string blob, every word in ASCII back to back
+
+The file is mapped read-only and words are decoded from the mapping when they are read, so
+loading it costs the same no matter how long the list is and all workers share one copy.
+get_valid_words only uses the file while valid_anagame_words.py still matches the checksum in it.
+
+Usage:
+  python -m Anagame.word_store [--output Anagame/valid_anagame_words.bin]
+'''
+import argparse
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Sequence
+from Shared.file_utils import atomic_write
+
+MAGIC = b"ANAWORDS"
+VERSION = 2
+SORTED_FLAG = 1
+HEADER = struct.Struct("<8sHHII32s32s12x")
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "valid_anagame_words.bin")
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "valid_anagame_words.py")
+NO_SOURCE = bytes(32)
+
+def file_checksum(path: str) -> bytes:
+    # hashing the source file is much cheaper than importing the list it holds
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).digest()
+
+class WordStore(Sequence):
+    '''Read-only sequence of words backed by a word store file (or any buffer in that format).'''
+    def __init__(self, buffer):
+        if len(buffer) < HEADER.size:
+            raise ValueError("word store file is too short to hold a header")
+        magic, version, flags, count, blob_size, checksum, source_checksum = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("not a word store file")
+        if version != VERSION:
+            raise ValueError("unsupported word store version " + str(version))
+
+        self.__buffer = buffer
+        self.__count = count
+        self.__blob_start = HEADER.size + 4 * (count + 1)
+        self.is_sorted = bool(flags & SORTED_FLAG)
+        self.source_checksum = source_checksum
+
+        if len(buffer) != self.__blob_start + blob_size:
+            raise ValueError("word store file has the wrong size")
+        # explicit little-endian, the file layout does not depend on the machine that reads it
+        self.__offsets = struct.unpack_from("<" + str(count + 1) + "I", buffer, HEADER.size)
+        if hashlib.sha256(buffer[self.__blob_start:]).digest() != checksum:
+            raise ValueError("word store checksum does not match")
+
+    def __len__(self):
+        return self.__count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.__count))]
+        if index < 0:
+            index += self.__count
+        if not 0 <= index < self.__count:
+            raise IndexError("word store index out of range")
+
+        start = self.__blob_start + self.__offsets[index]
+        end = self.__blob_start + self.__offsets[index + 1]
+        return self.__buffer[start:end].decode("ascii")
+
+    def __iter__(self):
+        blob = self.__buffer[self.__blob_start:].decode("ascii")
+        offsets = self.__offsets
+        for i in range(self.__count):
+            yield blob[offsets[i]:offsets[i + 1]]
+
+    def __contains__(self, word):
+        if not self.is_sorted:
+            return super().__contains__(word)
+        index = bisect.bisect_left(self, word)
+        return index < self.__count and self[index] == word
+
+def pack_words(words: list[str], source_checksum: bytes = NO_SOURCE) -> bytes:
+    # the whole file as bytes, see the layout at the top of this module
+    encoded = [word.encode("ascii") for word in words]
+    offsets = [0]
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+    blob = b"".join(encoded)
+
+    flags = SORTED_FLAG if list(words) == sorted(words) else 0
+    header = HEADER.pack(MAGIC, VERSION, flags, len(encoded), len(blob), hashlib.sha256(blob).digest(), source_checksum)
+    return header + struct.pack("<" + str(len(offsets)) + "I", *offsets) + blob
+
+def write_word_store(path: str, words: list[str], source_checksum: bytes = NO_SOURCE):
+    # written next to the destination and renamed over it, so readers never see half a file
+    with atomic_write(path) as file:
+        file.write(pack_words(words, source_checksum))
+
+def open_word_store(path: str) -> WordStore:
+    with open(path, "rb") as file:
+        return WordStore(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+shared_store = None
+shared_store_lock = threading.Lock()
+
+def get_valid_words() -> WordStore:
+    '''Returns the Anagame word list as a shared, read-only sequence.
+
+       The store file is mapped the first time this is called. If it is missing, cannot be read,
+       or was built from a different valid_anagame_words.py, the list is packed from
+       valid_anagame_words.py in memory instead.
+    '''
+    global shared_store
+    if shared_store is None:
+        with shared_store_lock:
+            if shared_store is None:
+                shared_store = load_valid_words()
+    return shared_store
+
+def load_valid_words() -> WordStore:
+    source_checksum = file_checksum(SOURCE_PATH) if os.path.exists(SOURCE_PATH) else None
+    if os.path.exists(DEFAULT_PATH):
+        try:
+            store = open_word_store(DEFAULT_PATH)
+        except (ValueError, OSError) as e:
+            print("Error loading valid_anagame_words.bin:", e)
+        else:
+            # without the source file there is nothing to check against, the store is all there is
+            if source_checksum is None or store.source_checksum == source_checksum:
+                return store
+            print("valid_anagame_words.bin is out of date, run python -m Anagame.word_store to rebuild it")
+    else:
+        print("Word store not included, packing the word list from valid_anagame_words.py")
+
+    from Anagame.valid_anagame_words import get_valid_word_list
+    return WordStore(pack_words(get_valid_word_list(), source_checksum or NO_SOURCE))
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Anagame word store from valid_anagame_words.py.")
+    parser.add_argument("--output", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    from Anagame.valid_anagame_words import get_valid_word_list
+    words = get_valid_word_list()
+    write_word_store(args.output, words, file_checksum(SOURCE_PATH))
+    print("Wrote", args.output, "with", len(words), "words,", os.path.getsize(args.output), "bytes")
+
+if __name__ == "__main__":
+    main()
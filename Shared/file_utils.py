@@ -0,0 +1,27 @@
+import contextlib
+import os
+import tempfile
+
+@contextlib.contextmanager
+def atomic_write(path: str):
+    '''Opens a temporary file next to path for binary writing and renames it over path when the
+       with block ends, so readers only ever see a complete file. If the block raises, the
+       temporary file is removed and path is left as it was.
+
+        Example
+        -------
+        >>> with atomic_write("Wordle/opening_book.npz") as file:
+        ...     np.savez(file, keys=keys)
+    '''
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
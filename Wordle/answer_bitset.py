@@ -0,0 +1,90 @@
+import base64
+import functools
+import hashlib
+import numpy as np
+from Wordle.pattern_matrix import PatternMatrix
+from Wordle.wordle_helper_functions import pattern_to_code
+
+MASK_CACHE_SIZE = 32768  # (guess, pattern) masks kept per worker, about 290 bytes each for the secret list
+HISTORY_CACHE_SIZE = 16384  # candidate sets for game histories, most players share their first few turns
+FINGERPRINT_BYTES = 4
+
+class AnswerBitsets:
+    '''Candidate answer sets as fixed-width bitsets over the answer IDs of a PatternMatrix.
+
+       A set is a packed uint8 array (np.packbits) with bit i set when answer i is still possible.
+       Filtering by a (guess, pattern) is a bitwise AND against the mask of answers that give
+       that pattern, and masks are kept in an LRU cache once they have been computed.
+
+       from_history rebuilds a candidate set from nothing but the guess/feedback history. Every
+       prefix of a history is cached, so players who open the same way share the early turns.
+
+       Tokens are the URL-safe base64 of a short fingerprint of the answer list followed by the
+       packed bits, so a token made against a different word list is rejected instead of misread.
+    '''
+    def __init__(self, matrix: PatternMatrix):
+        self.matrix = matrix
+        self.num_answers = len(matrix.answers)
+        self.num_bytes = (self.num_answers + 7) // 8
+        self.fingerprint = hashlib.sha256("\n".join(matrix.answers).encode("ascii")).digest()[:FINGERPRINT_BYTES]
+        self.all_answers = self.from_ids(np.arange(self.num_answers))
+        self.all_answers.flags.writeable = False
+        self.mask = functools.lru_cache(maxsize=MASK_CACHE_SIZE)(self.__compute_mask)
+        self.from_history = functools.lru_cache(maxsize=HISTORY_CACHE_SIZE)(self.__compute_history)
+
+    def __compute_mask(self, guess_id: int, code: int) -> np.ndarray:
+        mask = np.packbits(self.matrix.patterns[guess_id] == code)
+        mask.flags.writeable = False
+        return mask
+
+    def __compute_history(self, history: tuple) -> np.ndarray:
+        # history is a tuple of (guess, pattern) pairs, oldest first
+        if len(history) == 0:
+            return self.all_answers
+
+        guess, pattern = history[-1]
+        bits = self.from_history(history[:-1]) & self.mask(self.matrix.guess_ids[guess], pattern_to_code(pattern))
+        bits.flags.writeable = False
+        return bits
+
+    def from_ids(self, answer_ids: np.ndarray) -> np.ndarray:
+        members = np.zeros(self.num_answers, dtype=bool)
+        members[answer_ids] = True
+        return np.packbits(members)
+
+    def to_ids(self, bits: np.ndarray) -> np.ndarray:
+        return np.flatnonzero(np.unpackbits(bits, count=self.num_answers))
+
+    def from_words(self, words: list[str]) -> np.ndarray:
+        return self.from_ids(self.matrix.get_answer_ids(words))
+
+    def to_words(self, bits: np.ndarray) -> list[str]:
+        return self.matrix.get_answers(self.to_ids(bits))
+
+    def count(self, bits: np.ndarray) -> int:
+        return int(np.unpackbits(bits, count=self.num_answers).sum())
+
+    def filter(self, bits: np.ndarray, guess: str, pattern: str) -> np.ndarray:
+        '''Keeps the answers in bits that would have given pattern as feedback for guess.'''
+        return bits & self.mask(self.matrix.guess_ids[guess], pattern_to_code(pattern))
+
+    def encode_token(self, bits: np.ndarray) -> str:
+        return base64.urlsafe_b64encode(self.fingerprint + bits.tobytes()).decode("ascii").rstrip("=")
+
+    def decode_token(self, token: str) -> np.ndarray:
+        '''Turns a token from encode_token back into a bitset.
+
+            Raises:
+             ValueError: if the token is malformed or was made for a different answer list
+        '''
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except (ValueError, TypeError):
+            raise ValueError("answer set token is not valid base64")
+
+        if len(raw) != FINGERPRINT_BYTES + self.num_bytes:
+            raise ValueError("answer set token has the wrong length")
+        if raw[:FINGERPRINT_BYTES] != self.fingerprint:
+            raise ValueError("answer set token was made for a different word list")
+
+        return np.frombuffer(raw, dtype=np.uint8, offset=FINGERPRINT_BYTES).copy()
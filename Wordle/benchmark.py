@@ -0,0 +1,139 @@
+'''
+Plays a full game against every secret word and reports how fast and how well the solver does.
+
+Each turn calls get_remaining_guesses and then calculate_entropies, exactly like the web client,
+and plays the guess with the highest entropy. The JSON report has latency percentiles per call
+and per turn, total wall time, peak memory and the average number of guesses to solve, so runs
+from different commits can be compared.
+
+Usage (from the repository root):
+  python -m Wordle.benchmark [--limit N] [--k K] [--output report.json]
+  python -m Wordle.benchmark --url http://127.0.0.1:8000 [--server-pid PID]
+
+Without --url the functions in main.py are called in-process. With --url the same requests go
+to a running server, and --server-pid reads that process's peak memory from /proc.
+'''
+import argparse
+import json
+import resource
+import time
+import urllib.request
+from Wordle.wordle_secret_words import get_secret_words
+from Wordle.wordle_helper_functions import get_feedback
+from Shared.benchmark_utils import current_commit, percentiles
+
+MAX_TURNS = 12  # a game that takes longer than this is counted as failed
+
+class InProcessClient:
+    def __init__(self):
+        import main
+        self.main = main
+
+    def get_remaining_guesses(self, guesses, feedback, current_possible_answers):
+        return self.main.get_remaining_guesses(guesses, feedback, current_possible_answers)
+
+    def get_entropies(self, possible_guesses, possible_answers, k):
+        return self.main.calculate_entropies(possible_guesses, possible_answers, k)
+
+class HttpClient:
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+
+    def post(self, path: str, body: dict):
+        request = urllib.request.Request(self.url + path, data=json.dumps(body).encode(),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+    def get_remaining_guesses(self, guesses, feedback, current_possible_answers):
+        return self.post("/wordle_get_remaining_guesses", {
+            "guesses": guesses, "feedback": feedback, "current_possible_answers": current_possible_answers})
+
+    def get_entropies(self, possible_guesses, possible_answers, k):
+        return self.post("/wordle_get_entropies", {
+            "possible_guesses": possible_guesses, "possible_answers": possible_answers, "k": k})
+
+def play(client, secret: str, word_list: list[str], k: int, timings: dict) -> int:
+    '''Plays one game and returns the number of guesses it took, or None if it was not solved.'''
+    guesses = [""]
+    feedback = []
+    possible_answers = word_list
+
+    for turn in range(1, MAX_TURNS + 1):
+        start = time.perf_counter()
+        possible_answers = client.get_remaining_guesses(guesses, feedback, possible_answers)
+        timings["remaining_guesses"].setdefault(turn, []).append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        entropies = client.get_entropies(word_list, possible_answers, k)
+        timings["entropies"].setdefault(turn, []).append((time.perf_counter() - start) * 1000)
+
+        guess = next(iter(entropies))
+        if guesses == [""]:
+            guesses = []
+        guesses.append(guess)
+        feedback.append(get_feedback(guess, secret))
+        if guess == secret:
+            return turn
+
+    return None
+
+def peak_memory_kb(server_pid: int = None) -> int:
+    if server_pid is None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open("/proc/" + str(server_pid) + "/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Wordle solver against every secret word.")
+    parser.add_argument("--url", help="base URL of a running server, the functions are called in-process if left out")
+    parser.add_argument("--server-pid", type=int, help="process ID of the server, for its peak memory")
+    parser.add_argument("--limit", type=int, help="only play against the first N secret words")
+    parser.add_argument("--k", type=int, default=None, help="ask for only the k best guesses, the full ranking if left out")
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    word_list = sorted(get_secret_words())
+    secrets = word_list[:args.limit] if args.limit else word_list
+    client = HttpClient(args.url) if args.url else InProcessClient()
+    timings = {"remaining_guesses": {}, "entropies": {}}
+
+    start = time.perf_counter()
+    results = [play(client, secret, word_list, args.k, timings) for secret in secrets]
+    wall_seconds = time.perf_counter() - start
+
+    solved = [turns for turns in results if turns is not None]
+    distribution = {}
+    for turns in solved:
+        distribution[turns] = distribution.get(turns, 0) + 1
+
+    report = {
+        "commit": current_commit(),
+        "mode": "http" if args.url else "in-process",
+        "games": len(secrets),
+        "solved": len(solved),
+        "average_guesses": sum(solved) / len(solved) if solved else None,
+        "max_guesses": max(solved) if solved else None,
+        "guess_distribution": dict(sorted(distribution.items())),
+        "wall_seconds": wall_seconds,
+        "peak_memory_kb": peak_memory_kb(args.server_pid),
+        "latency": {
+            call: {
+                "all_turns": percentiles([sample for samples in per_turn.values() for sample in samples]),
+                "per_turn": {turn: percentiles(samples) for turn, samples in sorted(per_turn.items())},
+            }
+            for call, per_turn in timings.items()
+        },
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
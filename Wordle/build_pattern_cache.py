@@ -0,0 +1,101 @@
+'''
+Builds the Wordle pattern cache (see pattern_file.py for the format) from the word lists.
+
+Usage:
+  python -m Wordle.build_pattern_cache [--output Wordle/pattern_cache.bin] [--workers N]
+                                       [--guesses words.txt] [--answers words.txt]
+
+Word list files hold one word per line. Both lists default to get_secret_words().
+'''
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from Wordle.wordle_secret_words import get_secret_words
+from Wordle.wordle_helper_functions import get_feedback, code_to_pattern
+from Wordle.pattern_matrix import PatternMatrix, compute_pattern_rows, encode_words
+from Wordle.pattern_file import write_pattern_file
+
+answer_letters = None  # set once in every worker process by init_worker
+
+def init_worker(answers: np.ndarray):
+    global answer_letters
+    answer_letters = answers
+
+def build_rows(start: int, guess_letters: np.ndarray) -> tuple:
+    return start, compute_pattern_rows(guess_letters, answer_letters)
+
+def build_matrix_parallel(guesses: list[str], answers: list[str], workers: int = None, chunk_rows: int = 64) -> PatternMatrix:
+    '''Computes the pattern for every (guess, answer) pair, spreading blocks of guesses over a process pool.
+
+        Args:
+         guesses (list): sorted, unique guesses
+         answers (list): sorted, unique answers
+         workers (int): number of processes, defaults to the number of cores
+         chunk_rows (int): guesses per task
+
+        Returns:
+         PatternMatrix: the full matrix
+    '''
+    guess_letters = encode_words(guesses)
+    answers_encoded = encode_words(answers)
+    patterns = np.empty((len(guesses), len(answers)), dtype=np.uint8)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        patterns[:] = compute_pattern_rows(guess_letters, answers_encoded)
+        return PatternMatrix(guesses, answers, patterns)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(answers_encoded,)) as pool:
+        futures = [pool.submit(build_rows, start, guess_letters[start:start + chunk_rows])
+                   for start in range(0, len(guesses), chunk_rows)]
+        for future in futures:
+            start, rows = future.result()
+            patterns[start:start + len(rows)] = rows
+
+    return PatternMatrix(guesses, answers, patterns)
+
+def spot_check(matrix: PatternMatrix, samples: int = 2000) -> int:
+    # compares random entries against the plain Python get_feedback, returns the number of mismatches
+    mismatches = 0
+    for i in range(samples):
+        guess_id = random.randrange(len(matrix.guesses))
+        answer_id = random.randrange(len(matrix.answers))
+        expected = get_feedback(matrix.guesses[guess_id], matrix.answers[answer_id])
+        if code_to_pattern(int(matrix.patterns[guess_id, answer_id])) != expected:
+            mismatches += 1
+    return mismatches
+
+def read_word_file(path: str) -> list[str]:
+    with open(path) as file:
+        return [line.strip().upper() for line in file if line.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Wordle pattern cache.")
+    parser.add_argument("--output", default="Wordle/pattern_cache.bin")
+    parser.add_argument("--workers", type=int, default=None, help="processes to use, defaults to the number of cores")
+    parser.add_argument("--guesses", help="file with one allowed guess per line")
+    parser.add_argument("--answers", help="file with one possible answer per line")
+    args = parser.parse_args()
+
+    answers = sorted(set(read_word_file(args.answers) if args.answers else get_secret_words()))
+    guesses = sorted(set(read_word_file(args.guesses))) if args.guesses else answers
+
+    start = time.perf_counter()
+    matrix = build_matrix_parallel(guesses, answers, args.workers)
+    elapsed = time.perf_counter() - start
+
+    mismatches = spot_check(matrix)
+    if mismatches:
+        raise SystemExit("error: " + str(mismatches) + " spot-checked patterns differ from get_feedback, cache not written")
+
+    write_pattern_file(args.output, matrix)
+
+    pairs = len(guesses) * len(answers)
+    print("Wrote", args.output, "with", len(guesses), "guesses and", len(answers), "answers")
+    print(pairs, "pairs in", round(elapsed, 3), "seconds,", int(pairs / elapsed), "pairs/second")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+'''
+Precomputed Wordle strategy as a decision tree keyed by the feedback path.
+
+Every node holds the guess to play and one child per feedback pattern that guess can get. The
+build searches, at every node, the `width` guesses with the highest entropy and keeps the one with
+the lowest total number of guesses over all answers under it. Subtrees are memoized by the set of
+answers they have to solve, since different paths often end up with the same set, and a guess
+is abandoned as soon as its running total can no longer beat the best one at that node.
+
+Usage:
+  python -m Wordle.decision_tree [--width 6] [--root-width 12] [--workers N] [--output Wordle/decision_tree.npz]
+
+File layout (numpy .npz), nodes are numbered breadth first from the root at 0:
+  checksum      SHA-256 of the word lists the tree was built from, see opening_book.word_list_checksum
+  node_guess    guess ID played at each node
+  child_start   edges of node i are child_start[i] to child_start[i + 1]
+  edge_code     feedback pattern code of each edge, sorted within a node
+  edge_child    node reached by each edge
+'''
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from Wordle.pattern_matrix import NUM_PATTERNS, PatternMatrix, build_pattern_matrix
+from Wordle.pattern_file import read_pattern_file
+from Wordle.entropy_engine import EntropyEngine, pattern_histograms
+from Wordle.opening_book import word_list_checksum
+from Wordle.wordle_helper_functions import pattern_to_code
+from Shared.file_utils import atomic_write
+
+GREEN_CODE = NUM_PATTERNS - 1
+
+class TreeSearch:
+    '''Depth-first search for the cheapest tree over a set of answers, memoized by answer set.
+
+       A node is (guess_id, {pattern code: child node}) and its cost is the total number of
+       guesses, from this node on, summed over every answer below it.
+    '''
+    def __init__(self, matrix: PatternMatrix, width: int):
+        self.matrix = matrix
+        self.width = width
+        self.engine = EntropyEngine(matrix)
+        self.all_guesses = np.arange(len(matrix.guesses))
+        self.memo = {}
+        # guess ID of each answer, -1 if the answer cannot be guessed
+        self.answer_guess = np.array([matrix.guess_ids.get(word, -1) for word in matrix.answers])
+
+    def candidates(self, answer_ids: np.ndarray, width: int) -> tuple:
+        # the highest entropy guesses, ties broken by the lower bound on their total cost
+        counts = pattern_histograms(self.matrix.patterns, self.all_guesses, answer_ids)
+        branches = (counts > 0).sum(axis=1)
+        solved = counts[:, GREEN_CODE] > 0
+        bounds = 3 * len(answer_ids) - branches - solved
+
+        useful = (branches > 1) | solved  # a guess that puts every answer in one non-green branch learns nothing
+        entropies = self.engine.entropies_from_counts(counts)
+        order = np.lexsort((bounds, -entropies))
+        order = order[useful[order]][:width]
+        return order, bounds[order]
+
+    def solve(self, answer_ids: np.ndarray) -> tuple:
+        '''Returns (cost, node) for the cheapest tree found over answer_ids.'''
+        key = answer_ids.tobytes()
+        if key in self.memo:
+            return self.memo[key]
+
+        if len(answer_ids) <= 2 and self.answer_guess[answer_ids[0]] >= 0:
+            # guess one of them, then the other if it was not right
+            guess_id = int(self.answer_guess[answer_ids[0]])
+            children = {}
+            if len(answer_ids) == 2:
+                other = answer_ids[1:]
+                children[int(self.matrix.patterns[guess_id, other[0]])] = self.solve(other)[1]
+            result = (2 * len(answer_ids) - 1, (guess_id, children))
+        else:
+            result = self.search(answer_ids)
+
+        self.memo[key] = result
+        return result
+
+    def search(self, answer_ids: np.ndarray, guess_ids: np.ndarray = None) -> tuple:
+        # tries guess_ids, or the best self.width candidates if not given
+        best_cost, best_node = float("inf"), None
+        if guess_ids is None:
+            guess_ids, bounds = self.candidates(answer_ids, self.width)
+        else:
+            bounds = np.zeros(len(guess_ids))
+
+        for guess_id, bound in zip(guess_ids.tolist(), bounds.tolist()):
+            if bound >= best_cost:
+                continue
+
+            codes = self.matrix.patterns[guess_id, answer_ids]
+            cost = len(answer_ids)
+            children = {}
+            for code in np.unique(codes).tolist():
+                if code == GREEN_CODE:
+                    continue
+                child_cost, child = self.solve(answer_ids[codes == code])
+                cost += child_cost
+                children[code] = child
+                if cost >= best_cost:
+                    break
+            else:
+                best_cost, best_node = cost, (guess_id, children)
+
+        return best_cost, best_node
+
+worker_search = None  # TreeSearch of a pool worker, set by init_worker
+
+def init_worker(pattern_file: str, matrix: PatternMatrix, width: int):
+    global worker_search
+    worker_search = TreeSearch(read_pattern_file(pattern_file) if pattern_file is not None else matrix, width)
+
+def solve_root_guess(guess_id: int) -> tuple:
+    # each worker keeps its own memo, so the subtrees it has already searched are reused for the next root guess
+    all_answers = np.arange(len(worker_search.matrix.answers))
+    return worker_search.search(all_answers, np.array([guess_id]))
+
+def build_decision_tree(matrix: PatternMatrix, width: int, root_width: int, workers: int, pattern_file: str = None) -> tuple:
+    '''Searches root_width first guesses, each on its own worker, and returns the best (cost, tree).'''
+    all_answers = np.arange(len(matrix.answers))
+    search = TreeSearch(matrix, width)
+    root_guesses = search.candidates(all_answers, root_width)[0].tolist()
+
+    if workers == 1:
+        results = [search.search(all_answers, np.array([guess_id])) for guess_id in root_guesses]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(pattern_file, None if pattern_file else matrix, width)) as pool:
+            results = list(pool.map(solve_root_guess, root_guesses))
+
+    return min(results, key=lambda result: result[0])
+
+def flatten(tree: tuple) -> dict:
+    # numbers the nodes breadth first and turns the nested tuples into flat arrays
+    node_guess, child_start, edge_code, edge_child = [], [0], [], []
+    queue = deque([tree])
+    next_node = 1
+
+    while queue:
+        guess_id, children = queue.popleft()
+        node_guess.append(guess_id)
+        for code in sorted(children):
+            edge_code.append(code)
+            edge_child.append(next_node)
+            queue.append(children[code])
+            next_node += 1
+        child_start.append(len(edge_code))
+
+    return {
+        "node_guess": np.array(node_guess, dtype=np.uint16 if max(node_guess) < 65536 else np.uint32),
+        "child_start": np.array(child_start, dtype=np.uint32),
+        "edge_code": np.array(edge_code, dtype=np.uint8),
+        "edge_child": np.array(edge_child, dtype=np.uint32),
+    }
+
+class DecisionTree:
+    '''A decision tree loaded from disk, walked by guess/feedback history.'''
+    def __init__(self, matrix: PatternMatrix, node_guess: np.ndarray, child_start: np.ndarray,
+                 edge_code: np.ndarray, edge_child: np.ndarray):
+        self.matrix = matrix
+        self.node_guess = node_guess.tolist()
+        self.child_start = child_start.tolist()
+        self.edge_code = edge_code
+        self.edge_child = edge_child.tolist()
+
+    @classmethod
+    def load(cls, path: str, matrix: PatternMatrix):
+        '''Reads a tree written by this module.
+
+            Raises:
+             ValueError: if the tree was built from different word lists than matrix
+        '''
+        with np.load(path) as data:
+            if str(data["checksum"]) != word_list_checksum(matrix):
+                raise ValueError("decision tree was built from different word lists")
+            return cls(matrix, data["node_guess"], data["child_start"], data["edge_code"], data["edge_child"])
+
+    def __len__(self):
+        return len(self.node_guess)
+
+    def next_guess(self, history: list[tuple]):
+        '''Follows the tree along the history of (guess, feedback) pairs.
+
+            Returns:
+             str: the guess to play next, or None if the history left the tree or is already solved
+        '''
+        node = 0
+        for guess, pattern in history:
+            if self.matrix.guesses[self.node_guess[node]] != guess:
+                return None
+
+            start, end = self.child_start[node], self.child_start[node + 1]
+            code = pattern_to_code(pattern)
+            edge = start + int(np.searchsorted(self.edge_code[start:end], code))
+            if edge == end or self.edge_code[edge] != code:
+                return None
+            node = self.edge_child[edge]
+
+        return self.matrix.guesses[self.node_guess[node]]
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Wordle decision tree.")
+    parser.add_argument("--width", type=int, default=6, help="guesses tried at every node below the root")
+    parser.add_argument("--root-width", type=int, default=12, help="first guesses tried")
+    parser.add_argument("--workers", type=int, default=None, help="processes to use, defaults to the number of cores")
+    parser.add_argument("--pattern-cache", default="Wordle/pattern_cache.bin")
+    parser.add_argument("--output", default="Wordle/decision_tree.npz")
+    args = parser.parse_args()
+
+    if os.path.exists(args.pattern_cache):
+        matrix, pattern_file = read_pattern_file(args.pattern_cache), args.pattern_cache
+    else:
+        matrix, pattern_file = build_pattern_matrix(), None
+
+    start = time.perf_counter()
+    cost, tree = build_decision_tree(matrix, args.width, args.root_width, args.workers or os.cpu_count() or 1, pattern_file)
+    elapsed = time.perf_counter() - start
+
+    arrays = flatten(tree)
+    with atomic_write(args.output) as file:
+        np.savez(file, checksum=np.array(word_list_checksum(matrix)), **arrays)
+
+    print("Wrote", args.output, "with", len(arrays["node_guess"]), "nodes in", round(elapsed, 1), "seconds")
+    print("Opening guess", matrix.guesses[tree[0]] + ", average", round(cost / len(matrix.answers), 4), "guesses per answer")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+def fingerprint(possible_guesses: list[str], possible_answers: list[str]) -> str:
+    '''Stable hash of a (guess set, answer set) pair. Order and duplicates do not change it, and
+       it is the same in every process, so it can also be used as a key on disk.
+    '''
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\n".join(sorted(set(possible_guesses))).encode())
+    digest.update(b"\0")
+    digest.update("\n".join(sorted(set(possible_answers))).encode())
+    return digest.hexdigest()
+
+def estimate_size(value: dict) -> int:
+    # rough memory used by a str -> float dict, counting the dict and every key and value
+    return sys.getsizeof(value) + sum(sys.getsizeof(key) + sys.getsizeof(item) for key, item in value.items())
+
+class EntropyCache:
+    '''LRU cache of entropy rankings with a time to live and a memory budget.
+
+       Entries are evicted oldest-use first once their combined estimated size goes over max_bytes,
+       and are dropped on lookup once they are older than ttl_seconds. Cached rankings are
+       shared between requests and must not be modified by callers.
+    '''
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.__entries = OrderedDict()  # key -> (expires_at, size, value)
+        self.__lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str):
+        '''Returns the cached value for key, or None if there is none or it has expired.'''
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, size, value = entry
+            if time.monotonic() >= expires_at:
+                del self.__entries[key]
+                self.size_bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: dict):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self.__lock:
+            old = self.__entries.pop(key, None)
+            if old is not None:
+                self.size_bytes -= old[1]
+
+            self.__entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+            self.size_bytes += size
+
+            while self.size_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self.__entries.popitem(last=False)
+                self.size_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.size_bytes = 0
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.__entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
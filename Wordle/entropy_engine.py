@@ -0,0 +1,92 @@
+import numpy as np
+from Wordle.pattern_matrix import NUM_PATTERNS, PatternMatrix
+
+CHUNK_ROWS = 64    # guesses per bincount call, keeps the index array small enough to stay in cache
+HISTOGRAM_WIDTH = 256  # one bin per uint8 value, so UNKNOWN_PATTERN entries fall outside the real patterns
+
+def pattern_histograms(patterns: np.ndarray, guess_ids: np.ndarray, answer_ids: np.ndarray) -> np.ndarray:
+    '''Counts how many of the answers fall into each feedback pattern, for every guess at once.
+
+        Args:
+         patterns (np.ndarray): the pattern matrix of a PatternMatrix
+         guess_ids (np.ndarray): rows of the matrix to score
+         answer_ids (np.ndarray): columns of the matrix that are still possible answers
+
+        Returns:
+         np.ndarray: int32 matrix where counts[i, p] is the number of answers that give pattern p for guess_ids[i]
+    '''
+    counts = np.empty((len(guess_ids), NUM_PATTERNS), dtype=np.int32)
+    offsets = (np.arange(CHUNK_ROWS, dtype=np.intp) * HISTOGRAM_WIDTH)[:, None]
+
+    for start in range(0, len(guess_ids), CHUNK_ROWS):
+        block = patterns[np.ix_(guess_ids[start:start + CHUNK_ROWS], answer_ids)]
+        rows = len(block)
+        # give every row its own range of bins so a single bincount does the whole block
+        bins = np.bincount((block + offsets[:rows]).ravel(), minlength=rows * HISTOGRAM_WIDTH)
+        counts[start:start + rows] = bins.reshape(rows, HISTOGRAM_WIDTH)[:, :NUM_PATTERNS]
+
+    return counts
+
+class EntropyEngine:
+    '''Scores guesses by the entropy of their feedback over the remaining answers.
+
+       The histograms for the full answer list are computed once up front. A request for a
+       set covering more than half of the answers is answered by subtracting the histograms of the
+       answers that were removed, so no request has to count more than half of the matrix.
+    '''
+    def __init__(self, matrix: PatternMatrix):
+        self.matrix = matrix
+        num_answers = len(matrix.answers)
+        self.__all_answers = np.arange(num_answers)
+        self.__full_counts = pattern_histograms(matrix.patterns, np.arange(len(matrix.guesses)), self.__all_answers)
+
+        # c * log2(c) for every count that can appear, looked up instead of recomputed
+        self.__xlogx = np.zeros(num_answers + 1)
+        self.__xlogx[1:] = np.arange(1, num_answers + 1) * np.log2(np.arange(1, num_answers + 1))
+
+    def histograms(self, guess_ids: np.ndarray, answer_ids: np.ndarray) -> np.ndarray:
+        if 2 * len(answer_ids) > len(self.__all_answers):
+            removed = np.setdiff1d(self.__all_answers, answer_ids, assume_unique=True)
+            if len(removed) == 0:
+                return self.__full_counts[guess_ids]
+            return self.__full_counts[guess_ids] - pattern_histograms(self.matrix.patterns, guess_ids, removed)
+        return pattern_histograms(self.matrix.patterns, guess_ids, answer_ids)
+
+    def entropies(self, guess_ids: np.ndarray, answer_ids: np.ndarray) -> np.ndarray:
+        '''Entropy in bits of each guess's feedback distribution.
+
+            Args:
+             guess_ids (np.ndarray): guesses to score
+             answer_ids (np.ndarray): sorted IDs of the remaining possible answers, without duplicates
+
+            Returns:
+             np.ndarray: one entropy per guess, 0.0 for guesses with no known answers
+        '''
+        return self.entropies_from_counts(self.histograms(guess_ids, answer_ids))
+
+    def entropies_from_counts(self, counts: np.ndarray) -> np.ndarray:
+        # H = log2(n) - sum(c * log2(c)) / n, which is the usual -sum(p * log2(p)) with p = c / n
+        totals = counts.sum(axis=1)
+        safe_totals = np.maximum(totals, 1)
+        result = np.log2(safe_totals) - self.__xlogx[counts].sum(axis=1) / safe_totals
+        result[totals == 0] = 0.0
+        return result
+
+def best_order(scores: np.ndarray, k: int = None) -> np.ndarray:
+    '''Indices of the k highest scores (all of them if k is None), best first. Equal scores keep
+       their original order. Only the k selected scores are sorted, the rest are split off by
+       argpartition in linear time.
+    '''
+    if k is None or k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    # argpartition picks an arbitrary one of the scores tied at the k-th place, so everything above
+    # the k-th score is kept and the free places go to the lowest indices tied with it
+    threshold = -np.partition(-scores, k - 1)[k - 1]
+    above = np.flatnonzero(scores > threshold)
+    tied = np.flatnonzero(scores == threshold)[:k - len(above)]
+    top = np.concatenate([above, tied])
+    return top[np.lexsort((top, -scores[top]))]
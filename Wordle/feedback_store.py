@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+from Wordle.pattern_matrix import build_pattern_matrix
+from Wordle.pattern_file import PatternFileError, read_pattern_file
+
+class FeedbackStore:
+    '''Process-wide holder for the Wordle feedback table, kept as a PatternMatrix.
+
+       The table is loaded the first time it is asked for and then shared by every request
+       handled by the worker. If the file on disk changes, the next call to get() loads the
+       new version and swaps it in in a single assignment, so requests never see a half loaded table.
+
+       paths are tried in order, each a binary pattern file (see pattern_file.py) that is
+       memory-mapped. The legacy pattern_cache.pkl is never read here, convert it with
+       python -m Wordle.pattern_file convert.
+    '''
+    def __init__(self, paths: list[str]):
+        self.paths = paths
+        self.path = None  # the file the current table came from
+        self.__lock = threading.Lock()
+        self.__table = None
+        self.__checked_mtimes = None  # mtimes of the files the last time a load was attempted
+        self.load_seconds = 0.0
+        self.load_count = 0
+        self.size_bytes = 0
+        self.last_error = None
+
+    def __file_mtimes(self):
+        mtimes = []
+        for path in self.paths:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def get(self):
+        '''Returns the feedback table, loading or reloading it if the file has changed.
+
+            Returns:
+             PatternMatrix: the feedback table, or None if it could not be loaded
+        '''
+        if self.__file_mtimes() != self.__checked_mtimes:
+            with self.__lock:
+                if self.__file_mtimes() != self.__checked_mtimes:
+                    self.reload()
+        return self.__table
+
+    def reload(self):
+        '''Loads the table from the first path that loads and swaps it in. The previous table is
+           kept if none of them do, and the table is built from the word lists if there is none yet.
+        '''
+        # the mtimes are only recorded once a table is in place, so get() calls from other threads
+        # wait on the lock instead of returning no table while the first one is still loading
+        mtimes = self.__file_mtimes()
+        existing = [path for path, mtime in zip(self.paths, mtimes) if mtime is not None]
+
+        start = time.perf_counter()
+        path, table, errors = None, None, []
+        for candidate in existing:
+            try:
+                table = read_pattern_file(candidate)
+            except (PatternFileError, ValueError, OSError) as e:
+                errors.append(candidate + ": " + str(e))
+                print("Error loading " + candidate + ":", e)
+                continue
+            path = candidate
+            break
+
+        if table is None:
+            if self.__table is not None:
+                self.last_error = "; ".join(errors) if errors else "file not found"
+                self.__checked_mtimes = mtimes
+                return
+            if existing:
+                print("No pattern cache could be loaded, building the pattern matrix from the secret word list")
+            else:
+                print("Pattern cache not included, building the pattern matrix from the secret word list. Run python -m Wordle.build_pattern_cache to create it ahead of time")
+            table = build_pattern_matrix()
+
+        self.load_seconds = time.perf_counter() - start
+        self.load_count += 1
+        self.size_bytes = table.size_bytes
+        self.last_error = "; ".join(errors) if errors else None
+        self.path = path
+        self.__table = table
+        self.__checked_mtimes = mtimes
+
+    @property
+    def memory_mapped(self) -> bool:
+        # every file is mapped, only a table built from the word lists has no path
+        return self.path is not None
+
+    def metrics(self) -> dict:
+        return {
+            "path": self.path,
+            "loaded": self.__table is not None,
+            "load_count": self.load_count,
+            "load_seconds": self.load_seconds,
+            "size_bytes": self.size_bytes,
+            "memory_mapped": self.memory_mapped,
+            "last_error": self.last_error,
+        }
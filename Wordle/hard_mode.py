@@ -0,0 +1,44 @@
+import functools
+import numpy as np
+from Wordle.pattern_matrix import PatternMatrix, encode_words
+
+MASK_CACHE_SIZE = 16384
+
+class HardModeFilter:
+    '''Works out which guesses are still allowed in hard mode.
+
+       In hard mode every green letter has to be played again in the same spot and every yellow
+       letter has to be used somewhere. Each (guess, feedback) turn therefore allows a fixed set of
+       guesses, which is computed from the precomputed letter tables once and kept in an LRU cache.
+       The guesses allowed in a game are the AND of the masks of all of its turns.
+    '''
+    def __init__(self, matrix: PatternMatrix):
+        self.matrix = matrix
+        self.letters = encode_words(matrix.guesses)
+        self.letter_counts = np.zeros((len(matrix.guesses), 256), dtype=np.uint8)
+        for position in range(self.letters.shape[1]):
+            np.add.at(self.letter_counts, (np.arange(len(matrix.guesses)), self.letters[:, position]), 1)
+        self.mask = functools.lru_cache(maxsize=MASK_CACHE_SIZE)(self.__compute_mask)
+
+    def __compute_mask(self, guess: str, pattern: str) -> np.ndarray:
+        allowed = np.ones(len(self.matrix.guesses), dtype=bool)
+        required = {}
+
+        for position, (letter, mark) in enumerate(zip(guess.encode("ascii"), pattern)):
+            if mark == "2":
+                allowed &= self.letters[:, position] == letter
+            if mark in "12":
+                required[letter] = required.get(letter, 0) + 1
+
+        for letter, count in required.items():
+            allowed &= self.letter_counts[:, letter] >= count
+
+        allowed.flags.writeable = False
+        return allowed
+
+    def allowed(self, history: list[tuple]) -> np.ndarray:
+        '''Which guesses, by guess ID, are allowed after the (guess, feedback) pairs in history.'''
+        allowed = np.ones(len(self.matrix.guesses), dtype=bool)
+        for guess, pattern in history:
+            allowed = allowed & self.mask(guess, pattern)
+        return allowed
@@ -0,0 +1,167 @@
+'''
+Two-step lookahead scoring for the "expert hint".
+
+A guess is scored by the expected number of guesses needed to solve the puzzle when it is followed,
+in every feedback branch, by the best second guess for that branch. Whatever is left after the
+second guess is costed with a lower bound instead of being searched: with m answers left, the
+next guess is right with probability at most 1/m and otherwise at least one more is needed.
+
+The same bound, applied to the one-step split of a guess, can never be beaten by its two-step
+score. Candidates are therefore taken in order of one-step entropy and skipped once their bound
+can no longer beat the best guess found so far.
+'''
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from Wordle.pattern_matrix import NUM_PATTERNS, PatternMatrix
+from Wordle.pattern_file import read_pattern_file
+from Wordle.entropy_engine import EntropyEngine, pattern_histograms
+
+GREEN_CODE = NUM_PATTERNS - 1  # "22222", the guess was the answer
+
+def lower_bounds(counts: np.ndarray, num_answers: int) -> np.ndarray:
+    '''Lower bound on the expected number of guesses, counting the scored guess, for each row of
+       pattern histograms. A branch with m answers costs at least 3 - 1/m guesses, except the
+       all-green branch which costs exactly 1.
+    '''
+    branches = (counts > 0).sum(axis=1)
+    solved = counts[:, GREEN_CODE] > 0
+    return (3 * num_answers - branches - solved) / num_answers
+
+def second_guess_cost(patterns: np.ndarray, guess_ids: np.ndarray, branch: np.ndarray) -> float:
+    # expected guesses from the second guess on, for the best second guess in guess_ids
+    if len(branch) == 2:
+        return 1.5  # guess one of the two
+    return float(lower_bounds(pattern_histograms(patterns, guess_ids, branch), len(branch)).min())
+
+def expected_guesses(patterns: np.ndarray, guess_id: int, answer_ids: np.ndarray, deadline: float = None) -> float:
+    '''Two-step expected number of guesses to solve when guess_id is played against answer_ids,
+       with the second guess in each branch picked from every guess in the matrix.
+
+       deadline is a time.time() value, checked before every branch. None is returned if it
+       passes before all of them are scored.
+    '''
+    guess_ids = np.arange(patterns.shape[0])
+    codes = patterns[guess_id, answer_ids]
+    total = 0.0
+
+    for code in np.unique(codes):
+        if deadline is not None and time.time() >= deadline:
+            return None
+        branch = answer_ids[codes == code]
+        if code == GREEN_CODE:
+            total += 1
+        elif len(branch) == 1:
+            total += 2
+        else:
+            total += len(branch) * (1 + second_guess_cost(patterns, guess_ids, branch))
+
+    return total / len(answer_ids)
+
+def default_workers() -> int:
+    # LOOKAHEAD_WORKERS if set, otherwise the cores split between the server's worker processes
+    # (WEB_CONCURRENCY, which gunicorn and uvicorn both read)
+    if os.environ.get("LOOKAHEAD_WORKERS"):
+        return max(int(os.environ["LOOKAHEAD_WORKERS"]), 1)
+    return max((os.cpu_count() or 1) // max(int(os.environ.get("WEB_CONCURRENCY", 1)), 1), 1)
+
+def pool_context():
+    # the server is multithreaded, so workers are started fresh instead of forked from it
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+worker_patterns = None  # pattern matrix of a pool worker, set by init_worker
+
+def init_worker(pattern_file: str, patterns: np.ndarray):
+    # workers map the same pattern file as the server when there is one, so no copy is sent over
+    global worker_patterns
+    worker_patterns = read_pattern_file(pattern_file).patterns if pattern_file is not None else patterns
+
+def evaluate_in_worker(guess_id: int, answer_ids: np.ndarray, deadline: float) -> tuple:
+    return guess_id, expected_guesses(worker_patterns, guess_id, answer_ids, deadline)
+
+class LookaheadSolver:
+    '''Finds the guess with the lowest two-step expected number of guesses.
+
+       With more than one worker, candidates are scored in waves of one per worker on a process
+       pool. Scoring a candidate checks the time budget between feedback branches and gives up
+       when it runs out, and the best guess found so far is returned.
+    '''
+    def __init__(self, matrix: PatternMatrix, engine: EntropyEngine, pattern_file: str = None, workers: int = None):
+        self.matrix = matrix
+        self.engine = engine
+        self.workers = workers or default_workers()
+        self.pool = None
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context(), initializer=init_worker,
+                                            initargs=(pattern_file, None if pattern_file else matrix.patterns))
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def solve(self, guess_ids: np.ndarray, answer_ids: np.ndarray, num_candidates: int, time_budget: float) -> dict:
+        '''Scores the num_candidates guesses with the highest entropy two steps deep.
+
+            Args:
+             guess_ids (np.ndarray): guesses that may be played
+             answer_ids (np.ndarray): sorted IDs of the remaining possible answers, at least one
+             num_candidates (int): how many of the best one-step guesses to look at
+             time_budget (float): seconds to spend before returning the best guess found so far
+
+            Returns:
+             dict: "scores" maps guess IDs to their expected number of guesses, "bounds" the lower
+                   bound of each candidate, "entropies" the one-step entropy, and "complete"
+                   tells whether every candidate was either scored or ruled out in time
+        '''
+        deadline = time.time() + time_budget  # wall clock, so worker processes can check it too
+        counts = self.engine.histograms(guess_ids, answer_ids)
+        entropies = self.engine.entropies_from_counts(counts)
+        bounds = lower_bounds(counts, len(answer_ids))
+
+        # highest entropy first, ties go to the guess with the better bound (usually a possible answer)
+        order = np.lexsort((bounds, -entropies))[:num_candidates]
+        candidates = guess_ids[order]
+        candidate_bounds = dict(zip(candidates.tolist(), bounds[order].tolist()))
+        candidate_entropies = dict(zip(candidates.tolist(), entropies[order].tolist()))
+
+        scores = {}
+        best = float("inf")
+        remaining = candidates.tolist()
+        timed_out = False
+
+        while remaining and not timed_out:
+            # a guess whose bound is no better than the best score so far can be skipped
+            remaining = [guess_id for guess_id in remaining if candidate_bounds[guess_id] < best]
+            wave, remaining = remaining[:self.workers], remaining[self.workers:]
+            if not wave:
+                break
+            if time.time() >= deadline:
+                remaining = wave + remaining
+                timed_out = True
+                break
+
+            if self.pool is None:
+                results = [(wave[0], expected_guesses(self.matrix.patterns, wave[0], answer_ids, deadline))]
+            else:
+                # workers give up at the deadline on their own, so waiting for the whole wave never
+                # runs far past it and nothing is left running in the pool for the next request
+                futures = [self.pool.submit(evaluate_in_worker, guess_id, answer_ids, deadline) for guess_id in wave]
+                results = [future.result() for future in futures]
+
+            for guess_id, score in results:
+                if score is None:
+                    remaining.append(guess_id)
+                    timed_out = True
+                    continue
+                scores[guess_id] = score
+                best = min(best, score)
+
+        return {
+            "scores": scores,
+            "bounds": candidate_bounds,
+            "entropies": candidate_entropies,
+            "complete": not any(candidate_bounds[guess_id] < best for guess_id in remaining),
+        }
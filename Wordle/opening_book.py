@@ -0,0 +1,122 @@
+'''
+Precomputed entropy rankings for the first two turns.
+
+Turn 1 always scores the full guess list against the full answer list, and turn 2 against one
+of the feedback branches of the opener. Both are known ahead of time, so this job ranks the full
+answer list and every branch of the N best openers and stores the results keyed by the same
+fingerprint calculate_entropies uses for its cache.
+
+Usage:
+  python -m Wordle.opening_book [--openers 10] [--output Wordle/opening_book.npz]
+'''
+import argparse
+import hashlib
+import os
+import time
+import numpy as np
+from Wordle.pattern_matrix import PatternMatrix, build_pattern_matrix
+from Wordle.pattern_file import read_pattern_file
+from Wordle.entropy_engine import EntropyEngine
+from Wordle.entropy_cache import fingerprint
+from Shared.file_utils import atomic_write
+
+def word_list_checksum(matrix: PatternMatrix) -> str:
+    # a book only applies to the exact word lists it was built from
+    digest = hashlib.sha256()
+    digest.update("\n".join(matrix.guesses).encode())
+    digest.update(b"\0")
+    digest.update("\n".join(matrix.answers).encode())
+    return digest.hexdigest()
+
+class OpeningBook:
+    '''Entropy rankings looked up by fingerprint(possible_guesses, possible_answers).
+
+       Every entry holds the entropy of each guess, in matrix order, and the order that sorts
+       them from best to worst, so serving an entry does no scoring and no sorting.
+    '''
+    def __init__(self, guesses: list[str], keys: list[str], entropies: np.ndarray, order: np.ndarray):
+        self.guesses = tuple(guesses)
+        self.rows = {key: row for row, key in enumerate(keys)}
+        self.entropies = entropies
+        self.order = order
+
+    @classmethod
+    def load(cls, path: str, matrix: PatternMatrix):
+        '''Reads a book written by build_opening_book.
+
+            Raises:
+             ValueError: if the book was built from different word lists than matrix
+        '''
+        with np.load(path) as data:
+            if str(data["checksum"]) != word_list_checksum(matrix):
+                raise ValueError("opening book was built from different word lists")
+            keys = [key.decode("ascii") for key in data["keys"]]
+            return cls(matrix.guesses, keys, data["entropies"], data["order"])
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, key: str, k: int = None):
+        '''Returns the ranking stored under key as a guess -> entropy dict, best first, or None.
+           Only the k best guesses are included if k is given.
+        '''
+        row = self.rows.get(key)
+        if row is None:
+            return None
+
+        order = self.order[row, :k]
+        return dict(zip([self.guesses[i] for i in order], self.entropies[row, order].tolist()))
+
+def build_opening_book(matrix: PatternMatrix, num_openers: int) -> tuple:
+    '''Ranks every guess against the full answer list and against every feedback branch
+       (with more than 2 answers) of the num_openers best first guesses.
+
+        Returns:
+         tuple: (keys, entropies, order) ready to be saved
+    '''
+    engine = EntropyEngine(matrix)
+    guess_ids = np.arange(len(matrix.guesses))
+    all_answers = np.arange(len(matrix.answers))
+
+    answer_sets = [all_answers]
+    first_turn = engine.entropies(guess_ids, all_answers)
+    for opener in np.argsort(-first_turn, kind="stable")[:num_openers]:
+        codes = matrix.patterns[opener]
+        for code in np.unique(codes):
+            branch = np.flatnonzero(codes == code)
+            if len(branch) > 2:
+                answer_sets.append(branch)
+
+    keys = {}
+    for answer_ids in answer_sets:
+        key = fingerprint(matrix.guesses, matrix.get_answers(answer_ids))
+        if key not in keys:
+            keys[key] = answer_ids
+
+    entropies = np.empty((len(keys), len(guess_ids)))
+    for row, answer_ids in enumerate(keys.values()):
+        entropies[row] = engine.entropies(guess_ids, answer_ids)
+    order = np.argsort(-entropies, axis=1, kind="stable").astype(np.uint16 if len(guess_ids) <= 65536 else np.uint32)
+
+    return list(keys), entropies, order
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Wordle opening book.")
+    parser.add_argument("--openers", type=int, default=10, help="number of first guesses to expand")
+    parser.add_argument("--pattern-cache", default="Wordle/pattern_cache.bin")
+    parser.add_argument("--output", default="Wordle/opening_book.npz")
+    args = parser.parse_args()
+
+    matrix = read_pattern_file(args.pattern_cache) if os.path.exists(args.pattern_cache) else build_pattern_matrix()
+
+    start = time.perf_counter()
+    keys, entropies, order = build_opening_book(matrix, args.openers)
+    elapsed = time.perf_counter() - start
+
+    with atomic_write(args.output) as file:
+        np.savez(file, checksum=np.array(word_list_checksum(matrix)), keys=np.array(keys, dtype="S32"),
+                 entropies=entropies, order=order)
+    print("Wrote", args.output, "with", len(keys), "rankings in", round(elapsed, 2), "seconds")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+'''
+Binary pattern cache format (all integers little-endian)
+
+  offset  size  field
+  0       8     magic, b"WORDLPAT"
+  8       2     format version (uint16), currently 1
+  10      1     word length L (uint8)
+  11      1     reserved, 0
+  12      4     number of guesses G (uint32)
+  16      4     number of answers A (uint32)
+  20      32    SHA-256 of the guess table followed by the answer table
+  52      4     CRC-32 of the pattern matrix (uint32)
+  56      8     reserved, 0
+  64      G*L   guess table: the sorted guesses as ASCII, back to back with no separators
+  ...     A*L   answer table: the sorted answers, same layout
+  ...           zero padding up to the next multiple of 64 bytes
+  ...     G*A   pattern matrix: uint8, row-major, one row per guess (see pattern_matrix.py)
+
+Workers map the file read-only, so the matrix lives once in the page cache no matter how
+many processes use it. Replace the file with os.replace (write_pattern_file does this)
+rather than writing into it, so workers that still have the old version mapped are unaffected.
+
+Usage:
+  python -m Wordle.pattern_file convert [pickle_path] [output_path]
+  python -m Wordle.pattern_file validate [path] [--recompute]
+'''
+import argparse
+import hashlib
+import mmap
+import pickle
+import struct
+import zlib
+import numpy as np
+from Shared.file_utils import atomic_write
+from Wordle.pattern_matrix import NUM_PATTERNS, UNKNOWN_PATTERN, PatternMatrix, compute_pattern_rows, encode_words
+
+MAGIC = b"WORDLPAT"
+VERSION = 1
+HEADER = struct.Struct("<8sHBxII32sI8x")
+ALIGNMENT = 64
+
+class PatternFileError(Exception):
+    pass
+
+def word_table_checksum(guess_table: bytes, answer_table: bytes) -> bytes:
+    return hashlib.sha256(guess_table + answer_table).digest()
+
+def matrix_offset(word_length: int, num_guesses: int, num_answers: int) -> int:
+    end_of_tables = HEADER.size + (num_guesses + num_answers) * word_length
+    return -(-end_of_tables // ALIGNMENT) * ALIGNMENT
+
+def write_pattern_file(path: str, matrix: PatternMatrix):
+    '''Writes matrix to path. The file is written next to its destination and then renamed
+       over it, so readers only ever see a complete file.
+    '''
+    word_length = len(matrix.guesses[0]) if matrix.guesses else 0
+    guess_table = "".join(matrix.guesses).encode("ascii")
+    answer_table = "".join(matrix.answers).encode("ascii")
+    patterns = np.ascontiguousarray(matrix.patterns, dtype=np.uint8)
+
+    header = HEADER.pack(MAGIC, VERSION, word_length, len(matrix.guesses), len(matrix.answers),
+                         word_table_checksum(guess_table, answer_table), zlib.crc32(patterns))
+    offset = matrix_offset(word_length, len(matrix.guesses), len(matrix.answers))
+    padding = offset - len(header) - len(guess_table) - len(answer_table)
+
+    with atomic_write(path) as file:
+        file.write(header)
+        file.write(guess_table)
+        file.write(answer_table)
+        file.write(b"\0" * padding)
+        file.write(patterns.tobytes())
+
+def read_header(buffer) -> tuple:
+    if len(buffer) < HEADER.size:
+        raise PatternFileError("file is too short to hold a header")
+
+    magic, version, word_length, num_guesses, num_answers, checksum, crc = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise PatternFileError("not a pattern cache file")
+    if version != VERSION:
+        raise PatternFileError("unsupported pattern cache version " + str(version))
+
+    expected_size = matrix_offset(word_length, num_guesses, num_answers) + num_guesses * num_answers
+    if len(buffer) != expected_size:
+        raise PatternFileError("file is " + str(len(buffer)) + " bytes, expected " + str(expected_size))
+
+    return word_length, num_guesses, num_answers, checksum, crc
+
+def read_pattern_file(path: str) -> PatternMatrix:
+    '''Maps the file read-only and wraps it in a PatternMatrix without copying the matrix.
+
+        Args:
+         path (str): location of a file written by write_pattern_file
+
+        Returns:
+         PatternMatrix: a matrix whose pattern array is backed by the mapped file
+    '''
+    with open(path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        word_length, num_guesses, num_answers, checksum, crc = read_header(buffer)
+
+        guess_end = HEADER.size + num_guesses * word_length
+        answer_end = guess_end + num_answers * word_length
+        guess_table = buffer[HEADER.size:guess_end]
+        answer_table = buffer[guess_end:answer_end]
+        if word_table_checksum(guess_table, answer_table) != checksum:
+            raise PatternFileError("word table checksum does not match")
+    except BaseException:
+        buffer.close()
+        raise
+
+    guesses = split_table(guess_table, word_length)
+    answers = split_table(answer_table, word_length)
+    # the array keeps the mapping alive for as long as the matrix is in use
+    patterns = np.frombuffer(buffer, dtype=np.uint8, count=num_guesses * num_answers,
+                             offset=matrix_offset(word_length, num_guesses, num_answers))
+    return PatternMatrix(guesses, answers, patterns.reshape(num_guesses, num_answers))
+
+def split_table(table: bytes, word_length: int) -> list[str]:
+    text = table.decode("ascii")
+    return [text[i:i + word_length] for i in range(0, len(text), word_length)]
+
+def validate_pattern_file(path: str, recompute: bool = False) -> list[str]:
+    '''Checks a pattern cache file and returns a list of problems, empty if the file is sound.
+
+        Args:
+         path (str): the file to check
+         recompute (bool): also rebuild every pattern from the word tables and compare
+
+        Returns:
+         list: descriptions of everything that is wrong with the file
+    '''
+    try:
+        matrix = read_pattern_file(path)
+    except (OSError, ValueError, PatternFileError) as e:
+        return [str(e)]
+
+    problems = []
+    with open(path, "rb") as file:
+        crc = HEADER.unpack(file.read(HEADER.size))[6]
+    if zlib.crc32(matrix.patterns) != crc:
+        problems.append("pattern matrix checksum does not match")
+
+    for name, words in (("guess", matrix.guesses), ("answer", matrix.answers)):
+        if list(words) != sorted(set(words)):
+            problems.append(name + " table is not sorted and unique")
+
+    invalid = (matrix.patterns >= NUM_PATTERNS) & (matrix.patterns != UNKNOWN_PATTERN)
+    if invalid.any():
+        problems.append(str(int(invalid.sum())) + " entries are not valid pattern codes")
+
+    if recompute and not problems:
+        expected = compute_pattern_rows(encode_words(matrix.guesses), encode_words(matrix.answers))
+        known = matrix.patterns != UNKNOWN_PATTERN
+        wrong = int((known & (matrix.patterns != expected)).sum())
+        if wrong:
+            problems.append(str(wrong) + " patterns differ from get_feedback")
+
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert and check Wordle pattern cache files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="convert pattern_cache.pkl to the binary format")
+    convert.add_argument("source", nargs="?", default="Wordle/pattern_cache.pkl")
+    convert.add_argument("output", nargs="?", default="Wordle/pattern_cache.bin")
+
+    validate = commands.add_parser("validate", help="check the integrity of a binary pattern cache")
+    validate.add_argument("path", nargs="?", default="Wordle/pattern_cache.bin")
+    validate.add_argument("--recompute", action="store_true", help="rebuild every pattern and compare")
+
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        with open(args.source, "rb") as file:
+            matrix = PatternMatrix.from_feedback_dict(pickle.load(file))
+        write_pattern_file(args.output, matrix)
+        problems = validate_pattern_file(args.output)
+        print("Wrote", args.output, "with", len(matrix.guesses), "guesses and", len(matrix.answers), "answers")
+    else:
+        problems = validate_pattern_file(args.path, args.recompute)
+        if not problems:
+            print(args.path, "is valid")
+
+    for problem in problems:
+        print("error:", problem)
+    raise SystemExit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import numpy as np
+from Wordle.wordle_secret_words import get_secret_words
+from Wordle.wordle_helper_functions import WORD_LENGTH, pattern_to_code
+
+NUM_PATTERNS = 3 ** WORD_LENGTH
+UNKNOWN_PATTERN = 255  # marks a (guess, answer) pair the source table had no entry for
+
+class PatternMatrix:
+    '''Dense version of the feedback table.
+
+       Every guess and every answer gets an integer ID (its index in the sorted word list), and
+       patterns[guess_id, answer_id] holds the feedback pattern for that pair as a base 3 code
+       between 0 and 242, so a lookup is a single array index instead of a dict of dicts of lists.
+    '''
+    def __init__(self, guesses: list[str], answers: list[str], patterns: np.ndarray):
+        self.guesses = tuple(guesses)
+        self.answers = tuple(answers)
+        self.guess_ids = {word: i for i, word in enumerate(self.guesses)}
+        self.answer_ids = {word: i for i, word in enumerate(self.answers)}
+        self.patterns = patterns
+
+        if self.patterns.shape != (len(self.guesses), len(self.answers)):
+            raise ValueError("pattern matrix shape does not match the word lists")
+
+    @classmethod
+    def from_feedback_dict(cls, feedback_dict: dict):
+        '''Converts the nested guess -> pattern -> list of answers dict from pattern_cache.pkl.'''
+        guesses = sorted(feedback_dict)
+        answers = set()
+        for pattern_dict in feedback_dict.values():
+            for words in pattern_dict.values():
+                answers.update(words)
+        answers = sorted(answers)
+
+        answer_ids = {word: i for i, word in enumerate(answers)}
+        patterns = np.full((len(guesses), len(answers)), UNKNOWN_PATTERN, dtype=np.uint8)
+
+        for guess_id, guess in enumerate(guesses):
+            for pattern, words in feedback_dict[guess].items():
+                ids = [answer_ids[word] for word in words]
+                patterns[guess_id, ids] = pattern_to_code(pattern)
+
+        return cls(guesses, answers, patterns)
+
+    @property
+    def size_bytes(self) -> int:
+        return self.patterns.nbytes + sum(len(word) for word in self.guesses) + sum(len(word) for word in self.answers)
+
+    def get_guess_ids(self, words: list[str]) -> np.ndarray:
+        # words that are not in the matrix are left out
+        return np.array([self.guess_ids[word] for word in words if word in self.guess_ids], dtype=np.intp)
+
+    def get_answer_ids(self, words: list[str]) -> np.ndarray:
+        # sorted and without duplicates, words that are not in the matrix are left out
+        return np.unique(np.array([self.answer_ids[word] for word in words if word in self.answer_ids], dtype=np.intp))
+
+    def get_answers(self, answer_ids: np.ndarray) -> list[str]:
+        return [self.answers[i] for i in answer_ids]
+
+    def filter_answers(self, answer_ids: np.ndarray, guess: str, pattern: str) -> np.ndarray:
+        '''Keeps the answers in answer_ids that would have given pattern as feedback for guess.'''
+        row = self.patterns[self.guess_ids[guess]]
+        return answer_ids[row[answer_ids] == pattern_to_code(pattern)]
+
+def encode_words(words: list[str]) -> np.ndarray:
+    # one row of character codes per word
+    return np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8).reshape(len(words), WORD_LENGTH)
+
+def compute_pattern_rows(guess_letters: np.ndarray, answer_letters: np.ndarray) -> np.ndarray:
+    '''Scores every guess against every answer at once, with the same duplicate letter rules
+       as get_feedback: greens are matched first, then each leftover answer letter can turn
+       at most one guess letter yellow, left to right.
+
+        Args:
+         guess_letters (np.ndarray): encode_words() of the guesses
+         answer_letters (np.ndarray): encode_words() of the answers
+
+        Returns:
+         np.ndarray: uint8 matrix of pattern codes with one row per guess and one column per answer
+    '''
+    num_answers = len(answer_letters)
+    answer_index = np.arange(num_answers)
+    rows = np.empty((len(guess_letters), num_answers), dtype=np.uint8)
+
+    for i, guess in enumerate(guess_letters):
+        green = answer_letters == guess
+
+        # how many of each letter every answer has left after the greens are taken out
+        unmatched = np.zeros((num_answers, 256), dtype=np.int8)
+        for position in range(WORD_LENGTH):
+            unmatched[answer_index, answer_letters[:, position]] += ~green[:, position]
+
+        codes = np.zeros(num_answers, dtype=np.int32)
+        for position in range(WORD_LENGTH):
+            available = unmatched[:, guess[position]]
+            yellow = ~green[:, position] & (available > 0)
+            unmatched[:, guess[position]] -= yellow
+            codes = codes * 3 + 2 * green[:, position] + yellow
+
+        rows[i] = codes
+
+    return rows
+
+def build_pattern_matrix(guesses: list[str] = None, answers: list[str] = None) -> PatternMatrix:
+    '''Builds the pattern matrix from scratch.
+
+        Args:
+         guesses (list): words that can be guessed, defaults to the answer list
+         answers (list): words that can be the secret word, defaults to get_secret_words()
+
+        Returns:
+         PatternMatrix: the matrix for every (guess, answer) pair
+    '''
+    if answers is None:
+        answers = get_secret_words()
+    answers = sorted(set(answers))
+    guesses = answers if guesses is None else sorted(set(guesses))
+
+    patterns = compute_pattern_rows(encode_words(guesses), encode_words(answers))
+    return PatternMatrix(guesses, answers, patterns)
@@ -1,10 +1,56 @@
 #!/usr/bin/env python3
 import itertools
 
+WORD_LENGTH = 5
+
 def get_all_patterns():
     elements = ["0", "1", "2"]
-    length = 5
-
-    patterns = list(itertools.product(elements, repeat=length))
+    patterns = list(itertools.product(elements, repeat=WORD_LENGTH))
     joined_patterns = [''.join(x) for x in patterns]
     return joined_patterns
+
+def get_feedback(guess: str, answer: str) -> str:
+    '''Scores a guess against the secret word. Each position is "2" for the right letter in the
+       right spot, "1" for a letter that is in the word somewhere else and "0" otherwise.
+       A repeated letter only scores as many times as it appears in the answer, greens first.
+
+        Args:
+         guess (str): the guessed word
+         answer (str): the secret word, same length as guess
+
+        Returns:
+         str: the feedback pattern, e.g. "20100"
+    '''
+    feedback = ["0"] * len(guess)
+    unmatched = []
+
+    for i in range(len(guess)):
+        if guess[i] == answer[i]:
+            feedback[i] = "2"
+        else:
+            unmatched.append(answer[i])
+
+    for i in range(len(guess)):
+        if feedback[i] != "2" and guess[i] in unmatched:
+            feedback[i] = "1"
+            unmatched.remove(guess[i])
+
+    return "".join(feedback)
+
+def pattern_to_code(pattern: str) -> int:
+    '''A pattern read as a base 3 number, which is also its index in get_all_patterns().
+
+        Raises:
+         ValueError: if pattern is not WORD_LENGTH characters, each of them "0", "1" or "2"
+    '''
+    # int() alone would take "0000", "+0000" or " 0000" and give the code of a different pattern
+    if len(pattern) != WORD_LENGTH or pattern.strip("012"):
+        raise ValueError("feedback must be " + str(WORD_LENGTH) + " characters of 0, 1 and 2, got " + repr(pattern))
+    return int(pattern, 3)
+
+def code_to_pattern(code: int, length: int = WORD_LENGTH) -> str:
+    digits = []
+    for i in range(length):
+        digits.append(str(code % 3))
+        code //= 3
+    return "".join(reversed(digits))
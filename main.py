@@ -22,34 +22,111 @@ def read_root():
 #------------------------------------------------
 #------------------------------------------------
 
-from scipy.stats import entropy
-from typing import Dict
+import itertools
 import os
-import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from typing import Dict
+from fastapi import HTTPException
+from pydantic import Field
 from fastapi.middleware.cors import CORSMiddleware
-from Wordle.wordle_helper_functions import get_all_patterns
+from Wordle.feedback_store import FeedbackStore
+from Wordle.entropy_engine import EntropyEngine, best_order
+from Wordle.answer_bitset import AnswerBitsets
+from Wordle.entropy_cache import EntropyCache, fingerprint
+from Wordle.opening_book import OpeningBook
+from Wordle.lookahead import LookaheadSolver
+from Wordle.decision_tree import DecisionTree
+from Wordle.hard_mode import HardModeFilter
+from Wordle.wordle_helper_functions import pattern_to_code
 
 #------------------------------------------------
-# Get feedback dict cache functions
+# Get pattern matrix cache functions
 #------------------------------------------------
-def get_feedback_dict():
-    feedback_dict = None
+feedback_store = FeedbackStore(["Wordle/pattern_cache.bin"])
 
-    if os.path.exists("Wordle/pattern_cache.pkl"):
-        try:
-            with open("Wordle/pattern_cache.pkl", "rb") as file:
-                feedback_dict = pickle.load(file)
-        except Exception as e:
-            print("Error loading pattern_cache.pkl:", e)
-    
-    if feedback_dict is None:
-        print("Feedback pickle not included")
+def get_pattern_matrix():
+    # shared by every request in this worker, only read from disk on first use or when the file changes
+    matrix = feedback_store.get()
+    if matrix is None:
+        raise HTTPException(status_code=503, detail="Wordle feedback table is not loaded")
+    return matrix
+
+entropy_engine = None
+entropy_engine_lock = threading.Lock()
+entropy_cache = EntropyCache(max_bytes=64 * 1024 * 1024, ttl_seconds=60 * 60)
+
+def get_entropy_engine():
+    # rebuilt whenever the store swaps in a new matrix, rankings from the old matrix are dropped with it
+    global entropy_engine
+    matrix = get_pattern_matrix()
+    if entropy_engine is None or entropy_engine.matrix is not matrix:
+        with entropy_engine_lock:
+            if entropy_engine is None or entropy_engine.matrix is not matrix:
+                entropy_engine = EntropyEngine(matrix)
+                entropy_cache.clear()
+    return entropy_engine
+
+opening_book = None
+opening_book_matrix = None  # the matrix opening_book was checked against, None if it has not been loaded
+opening_book_lock = threading.Lock()
 
-    return feedback_dict
+def get_opening_book():
+    # rankings for the first two turns, built offline with python -m Wordle.opening_book
+    global opening_book, opening_book_matrix
+    matrix = get_pattern_matrix()
+    if opening_book_matrix is not matrix:
+        with opening_book_lock:
+            if opening_book_matrix is not matrix:
+                book = None
+                if os.path.exists("Wordle/opening_book.npz"):
+                    try:
+                        book = OpeningBook.load("Wordle/opening_book.npz", matrix)
+                    except Exception as e:
+                        print("Error loading opening_book.npz:", e)
+                # the book goes in before its matrix, callers that skip the lock never pair a new matrix with the old book
+                opening_book = book
+                opening_book_matrix = matrix
+    return opening_book
+
+answer_bitsets = None
+answer_bitsets_lock = threading.Lock()
+
+def get_answer_bitsets():
+    global answer_bitsets
+    matrix = get_pattern_matrix()
+    if answer_bitsets is None or answer_bitsets.matrix is not matrix:
+        with answer_bitsets_lock:
+            if answer_bitsets is None or answer_bitsets.matrix is not matrix:
+                answer_bitsets = AnswerBitsets(matrix)
+    return answer_bitsets
 
 #------------------------------------------------
 # Reduce guess list functions
 #------------------------------------------------
+def check_history(guesses: list[str], feedback: list[str]):
+    '''Checks a guess/feedback history once, before the functions below use it. Each feedback
+       string belongs to the guess at the same index, and empty guesses are skipped.
+
+        Raises:
+         HTTPException: 400 if there is more feedback than guesses, a guess that has feedback is
+            not in the word list, or a feedback string is not a valid pattern
+    '''
+    if len(feedback) > len(guesses):
+        raise HTTPException(status_code=400, detail="got " + str(len(feedback)) + " feedback strings for " + str(len(guesses)) + " guesses")
+
+    guess_ids = get_pattern_matrix().guess_ids
+    for guess, pattern in zip(guesses, feedback):
+        if guess == "":
+            continue
+        if guess not in guess_ids:
+            raise HTTPException(status_code=400, detail="unknown guess " + repr(guess))
+        try:
+            pattern_to_code(pattern)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
 def get_remaining_guesses(guesses: list[str], feedback: list[str], current_possible_answers: list[str]):
     '''Reduces the list of possible answers based on the most recent feedback. Returns a new list of 
        possible answers that is a subset of current_possible_answers
@@ -63,74 +140,351 @@ def get_remaining_guesses(guesses: list[str], feedback: list[str], current_possi
         Returns:
          possible_answers (list): a list of remaining possible words that could be the secret word
     '''
-    if (guesses[0] == ""):  # current guess is the first guess -> valid guesses is the list of all valid guesses
+    if len(feedback) == 0 or guesses[0] == "":  # current guess is the first guess -> valid guesses is the list of all valid guesses
         return current_possible_answers
-    
-    feedback_dict = get_feedback_dict()
-    possible_answers = set()
-    current_possible_answers = set(current_possible_answers)
+
+    bitsets = get_answer_bitsets()
+    possible_answers = filter_answer_bits(guesses, feedback, bitsets.from_words(current_possible_answers))
+
+    return bitsets.to_words(possible_answers)
+
+def filter_answer_bits(guesses: list[str], feedback: list[str], current_possible_answers: np.ndarray) -> np.ndarray:
+    '''Same as get_remaining_guesses, but the answer sets are bitsets from get_answer_bitsets().'''
+    if len(feedback) == 0 or guesses[0] == "":
+        return current_possible_answers
+
     last_guess = guesses[len(feedback) - 1]
     last_feedback = feedback[len(feedback) - 1]
+    if last_guess == "":
+        return current_possible_answers
+    return get_answer_bitsets().filter(current_possible_answers, last_guess, last_feedback)
 
-    words = feedback_dict[last_guess][last_feedback]
-    possible_answers = current_possible_answers.intersection(words)
+def get_history_answer_bits(guesses: list[str], feedback: list[str]) -> np.ndarray:
+    '''Works out the possible answers from the whole game so far instead of from the client's last list.
 
-    return list(possible_answers)
+        Args:
+         guesses (list): A list of string guesses, which could be empty
+         feedback (list): A list of feedback strings, one per guess that has been scored
+
+        Returns:
+         np.ndarray: bitset of the answers consistent with every guess and its feedback
+    '''
+    history = tuple((guesses[i], feedback[i]) for i in range(len(feedback)) if guesses[i] != "")
+    return get_answer_bitsets().from_history(history)
 
 class GetRemainingGuesses(BaseModel):
     guesses: list[str]
     feedback: list[str]
-    current_possible_answers: list[str]
+    # leave out both of these to have the answers worked out from the full guess/feedback history
+    current_possible_answers: list[str] | None = None
+    current_possible_answers_token: str | None = None  # token from an earlier response, instead of the word list
+    return_token: bool = False
+
+class RemainingAnswersToken(BaseModel):
+    token: str
+    count: int
 
 @app.post("/wordle_get_remaining_guesses")
-def handle_get_remaining_guesses(request: GetRemainingGuesses) -> list[str]: 
-    result = get_remaining_guesses(request.guesses, request.feedback, request.current_possible_answers)
-    return result
+def handle_get_remaining_guesses(request: GetRemainingGuesses) -> list[str] | RemainingAnswersToken: 
+    try:
+        return remaining_guesses_response(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def remaining_guesses_response(request: GetRemainingGuesses) -> list[str] | RemainingAnswersToken:
+    # raises ValueError for a malformed token
+    check_history(request.guesses, request.feedback)
+    if request.current_possible_answers_token is None and request.current_possible_answers is not None and not request.return_token:
+        result = get_remaining_guesses(request.guesses, request.feedback, request.current_possible_answers)
+        return result
+
+    bitsets = get_answer_bitsets()
+    if request.current_possible_answers_token is not None:
+        current_possible_answers = bitsets.decode_token(request.current_possible_answers_token)
+        possible_answers = filter_answer_bits(request.guesses, request.feedback, current_possible_answers)
+    elif request.current_possible_answers is not None:
+        possible_answers = filter_answer_bits(request.guesses, request.feedback, bitsets.from_words(request.current_possible_answers))
+    else:
+        possible_answers = get_history_answer_bits(request.guesses, request.feedback)
+
+    if request.return_token:
+        return RemainingAnswersToken(token=bitsets.encode_token(possible_answers), count=bitsets.count(possible_answers))
+    return bitsets.to_words(possible_answers)
 
 #------------------------------------------------
 # Entropy functions
 #------------------------------------------------
-def calculate_entropies(possible_guesses: list[str], possible_answers: list[str]) -> Dict[str, float]:
+def calculate_entropies(possible_guesses: list[str], possible_answers: list[str], k: int = None) -> Dict[str, float]:
     '''
     Calculates the entropy for every guess in possible guesses, taking into account 
     the remaining possible answers. 
         Args:
             possible_guesses (list): a list of all valid guesses. Will not be empty
             possible_answers (list): a list of all words that could be the secret word. Will not be empty
+            k (int): if given, only the k best guesses are returned
 
         Returns:
             entropies (list): a list of entropies that correspond to each guess in possible_guesses
     '''
-    entropies = {}
-    feedback_dict = get_feedback_dict()
-    all_patterns = get_all_patterns()
     possible_answers = set(possible_answers)
     if len(possible_answers) <= 2:
-        return {answer: 1.0 for answer in possible_answers}
-    
-    for guess in possible_guesses: # ~2,500 words
-        counts = []
-        for pattern in all_patterns: # 243 patterns
-            if ((guess not in feedback_dict) or (pattern not in feedback_dict[guess])):
-                continue
-            answers = (set(feedback_dict[guess][pattern])).intersection(possible_answers)
-            counts.append(len(answers))
-        total = sum(counts)
-        if total > 0: 
-            counts = [c / total for c in counts if c > 0]
-            entropies[guess] = entropy(counts, base = 2)
-        else: 
-            entropies[guess] = 0.0
-    sorted_entropies = dict(sorted(entropies.items(), key=lambda item: item[1], reverse=True))
+        return {answer: 1.0 for answer in itertools.islice(possible_answers, k)}
+
+    # the same guess and answer sets always rank the same, guesses with equal entropy keep the
+    # order of the request that filled the cache
+    engine = get_entropy_engine()
+    key = fingerprint(possible_guesses, possible_answers)
+    if k is not None:
+        key += "/top" + str(k)
+    cached = entropy_cache.get(key)
+    if cached is not None:
+        return cached
+
+    book = get_opening_book()
+    ranked = book.get(key.split("/")[0], k) if book is not None else None
+    if ranked is not None:
+        entropy_cache.put(key, ranked)
+        return ranked
+
+    matrix = engine.matrix
+    answer_ids = matrix.get_answer_ids(possible_answers)
+
+    # every guess is scored in one batch, guesses missing from the matrix keep an entropy of 0
+    guesses = list(dict.fromkeys(possible_guesses))
+    known = [i for i in range(len(guesses)) if guesses[i] in matrix.guess_ids]
+    guess_ids = np.array([matrix.guess_ids[guesses[i]] for i in known], dtype=np.intp)
+    scores = np.zeros(len(guesses))
+    scores[known] = engine.entropies(guess_ids, answer_ids)
+
+    order = best_order(scores, k)
+    sorted_entropies = dict(zip([guesses[i] for i in order], scores[order].tolist()))
+    entropy_cache.put(key, sorted_entropies)
     return sorted_entropies
 
+hard_mode_filter = None
+hard_mode_filter_lock = threading.Lock()
+
+def get_hard_mode_filter():
+    global hard_mode_filter
+    matrix = get_pattern_matrix()
+    if hard_mode_filter is None or hard_mode_filter.matrix is not matrix:
+        with hard_mode_filter_lock:
+            if hard_mode_filter is None or hard_mode_filter.matrix is not matrix:
+                hard_mode_filter = HardModeFilter(matrix)
+    return hard_mode_filter
+
+def get_hard_mode_guesses(possible_guesses: list[str], guesses: list[str], feedback: list[str]) -> list[str]:
+    '''Keeps the guesses that are still allowed in hard mode: every green letter in the same spot
+       and every yellow letter somewhere in the word. Guesses missing from the word list are dropped.
+
+        Args:
+         possible_guesses (list): a list of all valid guesses
+         guesses (list): A list of string guesses, which could be empty
+         feedback (list): A list of feedback strings, one per guess that has been scored
+
+        Returns:
+         list: the guesses from possible_guesses that may be played next
+    '''
+    hard_mode = get_hard_mode_filter()
+    guess_ids = hard_mode.matrix.guess_ids
+    history = [(guesses[i], feedback[i]) for i in range(len(feedback)) if guesses[i] != ""]
+    allowed = hard_mode.allowed(history)
+    return [guess for guess in possible_guesses if guess in guess_ids and allowed[guess_ids[guess]]]
+
 class GetEntropies(BaseModel):
     possible_guesses: list[str]
     possible_answers: list[str]
+    k: int | None = Field(default=None, ge=1)  # only return the k best guesses
+    hard_mode: bool = False  # only score the guesses allowed after guesses/feedback
+    guesses: list[str] = []
+    feedback: list[str] = []
 
 @app.post("/wordle_get_entropies")
 def get_entropies(request: GetEntropies) -> dict: 
-    result = calculate_entropies(request.possible_guesses, request.possible_answers)
+    possible_guesses = request.possible_guesses
+    if request.hard_mode:
+        check_history(request.guesses, request.feedback)
+        possible_guesses = get_hard_mode_guesses(possible_guesses, request.guesses, request.feedback)
+        if len(possible_guesses) == 0:
+            return {}
+    result = calculate_entropies(possible_guesses, request.possible_answers, request.k)
+    return result
+
+#------------------------------------------------
+# Batch evaluation functions
+#------------------------------------------------
+batch_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+MAX_BATCH_STATES = 1000  # larger batches are rejected before any state is evaluated
+
+class GameState(BaseModel):
+    guesses: list[str]
+    feedback: list[str]
+    current_possible_answers: list[str] | None = None  # worked out from the full history when left out
+    possible_guesses: list[str] | None = None  # defaults to every guess in the word list
+    hard_mode: bool = False
+
+class BatchEvaluate(BaseModel):
+    states: list[GameState] = Field(max_length=MAX_BATCH_STATES)
+    k: int = Field(default=10, ge=1)
+    include_answers: bool = True
+
+class StateResult(BaseModel):
+    possible_answers: list[str] | None
+    count: int
+    entropies: Dict[str, float]
+
+def evaluate_state(state: GameState, k: int, include_answers: bool) -> StateResult:
+    '''Filters the answers of one game state and scores its k best next guesses.'''
+    bitsets = get_answer_bitsets()
+    if state.current_possible_answers is None:
+        answer_bits = get_history_answer_bits(state.guesses, state.feedback)
+    else:
+        answer_bits = filter_answer_bits(state.guesses, state.feedback, bitsets.from_words(state.current_possible_answers))
+    possible_answers = bitsets.to_words(answer_bits)
+
+    possible_guesses = state.possible_guesses if state.possible_guesses is not None else list(bitsets.matrix.guesses)
+    if state.hard_mode:
+        possible_guesses = get_hard_mode_guesses(possible_guesses, state.guesses, state.feedback)
+
+    entropies = calculate_entropies(possible_guesses, possible_answers, k) if possible_guesses else {}
+    return StateResult(
+        possible_answers=possible_answers if include_answers else None,
+        count=len(possible_answers),
+        entropies=entropies,
+    )
+
+def state_key(state: GameState) -> tuple:
+    return (tuple(state.guesses), tuple(state.feedback),
+            tuple(state.current_possible_answers) if state.current_possible_answers is not None else None,
+            tuple(state.possible_guesses) if state.possible_guesses is not None else None,
+            state.hard_mode)
+
+@app.post("/wordle_batch")
+def handle_batch(request: BatchEvaluate) -> list[StateResult]:
+    # identical states are only evaluated once, the rest are spread over the thread pool and
+    # share the pattern matrix, caches and opening book of this worker
+    get_entropy_engine()
+    unique_states = {}
+    for i, state in enumerate(request.states):
+        # every state is checked before any is evaluated, so one bad state fails the batch with a 400 naming it
+        try:
+            check_history(state.guesses, state.feedback)
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail="state " + str(i) + ": " + e.detail)
+        unique_states.setdefault(state_key(state), state)
+
+    results = batch_pool.map(lambda state: evaluate_state(state, request.k, request.include_answers), unique_states.values())
+    results = dict(zip(unique_states, results))
+    return [results[state_key(state)] for state in request.states]
+
+#------------------------------------------------
+# Lookahead solver functions
+#------------------------------------------------
+lookahead_solver = None
+lookahead_solver_lock = threading.Lock()
+
+def get_lookahead_solver():
+    # one process pool per matrix, workers map the same pattern file as this process
+    global lookahead_solver
+    engine = get_entropy_engine()
+    if lookahead_solver is None or lookahead_solver.engine is not engine:
+        with lookahead_solver_lock:
+            if lookahead_solver is None or lookahead_solver.engine is not engine:
+                if lookahead_solver is not None:
+                    lookahead_solver.shutdown()
+                pattern_file = feedback_store.path if feedback_store.memory_mapped else None
+                lookahead_solver = LookaheadSolver(engine.matrix, engine, pattern_file)
+    return lookahead_solver
+
+def solve_lookahead(possible_guesses: list[str], possible_answers: list[str], num_candidates: int, time_budget_ms: int) -> dict:
+    '''Finds the guess that solves the puzzle in the fewest expected guesses, looking two guesses ahead.
+
+        Args:
+            possible_guesses (list): a list of all valid guesses
+            possible_answers (list): a list of all words that could be the secret word
+            num_candidates (int): how many of the highest entropy guesses to score two steps deep
+            time_budget_ms (int): milliseconds to search before returning the best guess found so far
+
+        Returns:
+            dict: the best guess, its expected number of guesses, whether the search finished, and
+                  the scored candidates from best to worst
+    '''
+    solver = get_lookahead_solver()
+    matrix = solver.matrix
+    guess_ids = matrix.get_guess_ids(list(dict.fromkeys(possible_guesses)))
+    answer_ids = matrix.get_answer_ids(possible_answers)
+    if len(guess_ids) == 0 or len(answer_ids) == 0:
+        raise HTTPException(status_code=400, detail="none of the guesses or answers are in the word list")
+
+    result = solver.solve(guess_ids, answer_ids, num_candidates, time_budget_ms / 1000)
+
+    # scored candidates first, then the ones there was no time for, by entropy
+    ranked = sorted(result["bounds"], key=lambda guess_id: (result["scores"].get(guess_id, float("inf")), -result["entropies"][guess_id]))
+    candidates = [{
+        "guess": matrix.guesses[guess_id],
+        "entropy": result["entropies"][guess_id],
+        "expected_guesses": result["scores"].get(guess_id),
+        "lower_bound": result["bounds"][guess_id],
+    } for guess_id in ranked]
+
+    return {
+        "best_guess": candidates[0]["guess"],
+        "expected_guesses": candidates[0]["expected_guesses"],
+        "complete": result["complete"],
+        "candidates": candidates,
+    }
+
+class Solve(BaseModel):
+    possible_guesses: list[str]
+    possible_answers: list[str]
+    candidates: int = Field(default=20, ge=1, le=500)
+    time_budget_ms: int = Field(default=1000, ge=0, le=30000)
+
+@app.post("/wordle_solve")
+def handle_solve(request: Solve) -> dict:
+    result = solve_lookahead(request.possible_guesses, request.possible_answers, request.candidates, request.time_budget_ms)
+    return result
+
+#------------------------------------------------
+# Decision tree functions
+#------------------------------------------------
+decision_tree = None
+decision_tree_matrix = None  # the matrix decision_tree was checked against, None if it has not been loaded
+decision_tree_lock = threading.Lock()
+
+def get_decision_tree():
+    # built offline with python -m Wordle.decision_tree
+    global decision_tree, decision_tree_matrix
+    matrix = get_pattern_matrix()
+    if decision_tree_matrix is not matrix:
+        with decision_tree_lock:
+            if decision_tree_matrix is not matrix:
+                tree = None
+                if os.path.exists("Wordle/decision_tree.npz"):
+                    try:
+                        tree = DecisionTree.load("Wordle/decision_tree.npz", matrix)
+                    except Exception as e:
+                        print("Error loading decision_tree.npz:", e)
+                # same order as the opening book, the tree before its matrix
+                decision_tree = tree
+                decision_tree_matrix = matrix
+    return decision_tree
+
+class GetTreeGuess(BaseModel):
+    guesses: list[str]
+    feedback: list[str]
+
+@app.post("/wordle_tree_next_guess")
+def handle_tree_next_guess(request: GetTreeGuess) -> str:
+    tree = get_decision_tree()
+    if tree is None:
+        raise HTTPException(status_code=503, detail="decision tree not included")
+
+    check_history(request.guesses, request.feedback)
+    history = [(request.guesses[i], request.feedback[i]) for i in range(len(request.feedback)) if request.guesses[i] != ""]
+    result = tree.next_guess(history)
+    if result is None:
+        raise HTTPException(status_code=404, detail="the game has left the decision tree or is already solved")
     return result
 
 #------------------------------------------------
@@ -139,11 +493,69 @@ def get_entropies(request: GetEntropies) -> dict:
 #------------------------------------------------
 #------------------------------------------------
 
+import time
 from Anagame.AnagramExplorer import AnagramExplorer
-from Anagame.valid_anagame_words import get_valid_word_list
+from Anagame.word_store import get_valid_words
 from Anagame.anagame import calc_stats, generate_letters
+from Anagame.rack_table import DEFAULT_PATH as RACK_TABLE_PATH, RackTable, build_rack_counts
+from Anagame.rack_pool import RackPool
 from typing import List, Tuple
 
+#------------------------------------------------
+# Shared explorer functions
+#------------------------------------------------
+anagram_explorer = None
+anagram_explorer_seconds = None  # how long the explorer took to build
+anagram_explorer_lock = threading.Lock()
+
+def get_anagram_explorer() -> AnagramExplorer:
+    # built on first use and shared by every request and thread in this worker, never modified after that
+    global anagram_explorer, anagram_explorer_seconds
+    if anagram_explorer is None:
+        with anagram_explorer_lock:
+            if anagram_explorer is None:
+                start = time.perf_counter()
+                explorer = AnagramExplorer(get_valid_words())
+                anagram_explorer_seconds = time.perf_counter() - start
+                anagram_explorer = explorer
+    return anagram_explorer
+
+rack_table = None
+rack_table_lock = threading.Lock()
+
+def get_rack_table() -> RackTable:
+    # built offline with python -m Anagame.rack_table, or in a second or two from the explorer if not included
+    global rack_table
+    if rack_table is None:
+        explorer = get_anagram_explorer()
+        with rack_table_lock:
+            if rack_table is None:
+                table = None
+                if os.path.exists(RACK_TABLE_PATH):
+                    try:
+                        table = RackTable.load(RACK_TABLE_PATH, explorer.corpus)
+                    except Exception as e:
+                        print("Error loading rack_table.npz:", e)
+                if table is None:
+                    table = RackTable.from_counts(build_rack_counts(explorer.anagram_lookup))
+                rack_table = table
+    return rack_table
+
+rack_pool = None
+rack_pool_lock = threading.Lock()
+
+def get_rack_pool() -> RackPool:
+    # its thread keeps drawing racks in the background from the first request on
+    global rack_pool
+    if rack_pool is None:
+        table = get_rack_table()
+        with rack_pool_lock:
+            if rack_pool is None:
+                pool = RackPool(table)
+                pool.start()
+                rack_pool = pool
+    return rack_pool
+
 #------------------------------------------------
 # Calculate end of game statistics functions
 #------------------------------------------------
@@ -153,8 +565,16 @@ class GetLetters(BaseModel):
     
 @app.post("/anagame_get_letters")
 def handle_get_letters(request: GetLetters) -> list[str]: 
-    explorer = AnagramExplorer(get_valid_word_list())
-    result = generate_letters(request.fun_factor, request.distribution, explorer)
+    result = get_rack_pool().take(request.fun_factor, request.distribution)
+    if result is not None:
+        return result
+
+    # the pool for this fun factor is empty, draw the rack here
+    explorer = get_anagram_explorer()
+    try:
+        result = generate_letters(request.fun_factor, request.distribution, explorer, get_rack_table())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return result
 
 #------------------------------------------------
@@ -175,7 +595,7 @@ class StatsResponse(BaseModel):
 
 @app.post("/anagame_calc_stats", response_model=StatsResponse)
 def handle_calc_stats(request: CalcStats) -> StatsResponse: 
-    explorer = AnagramExplorer(get_valid_word_list())
+    explorer = get_anagram_explorer()
     result = calc_stats(request.guesses, request.letters, explorer) #guesses needs to be tuples
         
     return StatsResponse(
@@ -196,9 +616,36 @@ class GetHint(BaseModel):
     
 @app.post("/anagame_get_hint")
 def handle_get_letters(request: GetHint) -> str: 
-    explorer = AnagramExplorer(get_valid_word_list())
+    explorer = get_anagram_explorer()
     result = explorer.get_most_anagrams(request.letters)
+    if result is None:
+        raise HTTPException(status_code=404, detail="no anagram pair can be made from these letters")
     return result
+
+#------------------------------------------------
+#------------------------------------------------
+# METRICS
+#------------------------------------------------
+#------------------------------------------------
+
+@app.get("/metrics")
+def get_metrics() -> dict:
+    return {
+        "wordle_feedback_table": feedback_store.metrics(),
+        "wordle_entropy_cache": entropy_cache.metrics(),
+        "wordle_opening_book_entries": len(opening_book) if opening_book is not None else 0,
+        "wordle_decision_tree_nodes": len(decision_tree) if decision_tree is not None else 0,
+        "wordle_history_cache": answer_bitsets.from_history.cache_info()._asdict() if answer_bitsets is not None else None,
+        "anagame_explorer": {
+            "loaded": anagram_explorer is not None,
+            "build_seconds": anagram_explorer_seconds,
+            "families": len(anagram_explorer.anagram_lookup) if anagram_explorer is not None else 0,
+        },
+        "anagame_rack_cache": anagram_explorer.cache_metrics() if anagram_explorer is not None else None,
+        "anagame_rack_table_racks": len(rack_table) if rack_table is not None else 0,
+        "anagame_rack_pool": rack_pool.metrics() if rack_pool is not None else None,
+    }
+
 #------------------------------------------------
 #------------------------------------------------
 # REAL TIME STOCK INDICATOR
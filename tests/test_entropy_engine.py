@@ -0,0 +1,19 @@
+import numpy as np
+from Wordle.entropy_engine import best_order
+
+def test_best_order_ties_straddling_k_match_full_ranking():
+    scores = np.array([1.0, 3.0, 2.0, 2.0, 3.0, 2.0, 0.5, 2.0])
+    full = best_order(scores)
+    for k in range(1, len(scores) + 1):
+        assert best_order(scores, k).tolist() == full[:k].tolist()
+
+def test_best_order_random_ties():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        scores = rng.integers(0, 4, size=50).astype(float)
+        full = best_order(scores)
+        for k in (1, 3, 10, 49):
+            assert best_order(scores, k).tolist() == full[:k].tolist()
+
+def test_best_order_k_zero():
+    assert best_order(np.array([1.0, 2.0]), 0).tolist() == []